@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Location, Post, Comment, Job, Change
+from .services import delete_comments
 
 
 admin.site.empty_value_display = 'Не задано'
@@ -43,7 +44,9 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'text',
         'pub_date',
-        'location'
+        'location',
+        'comment_count',
+        'image_status',
     )
     search_fields = ('title',)
     list_filter = ('category',)
@@ -58,8 +61,39 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('author',)
 
+    def delete_model(self, request, obj):
+        # Удаление идёт в обход сигналов: см. delete_comments.
+        delete_comments([obj])
+
+    def delete_queryset(self, request, queryset):
+        delete_comments(queryset.only('pk', 'post_id'))
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_after',
+        'last_error',
+    )
+    list_filter = ('status', 'name')
+
+
+class ChangeAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'model_name',
+        'object_id',
+        'action',
+        'created_at',
+    )
+    list_filter = ('model_name', 'action')
+
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
+admin.site.register(Change, ChangeAdmin)
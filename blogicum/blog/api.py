@@ -0,0 +1,236 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.db.models import Case, F, When
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from .changes import read_changes
+from .constants import (API_MAX_PAGE_SIZE, API_PAGINATE_COUNT,
+                        CHANGES_PAGINATE_COUNT, COMMENTS_PAGINATE_COUNT)
+from .models import Category, Comment, Post, User
+from .paginators import CursorPaginator
+from .services import filter_published_posts, get_published_category
+
+# Поле ответа → путь для values() или выражение. Связанные таблицы
+# присоединяются, только если клиент запросил их поля.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    # Снятое с публикации место не показывается, как и на сайте.
+    'location': Case(When(location__is_published=True,
+                          then=F('location__name'))),
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+POST_LIST_FIELDS = tuple(name for name in POST_FIELDS if name != 'text')
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'author': 'author__username',
+    'created_at': 'created_at',
+}
+COMMENT_ORDERING = ('created_at', 'id')
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+CATEGORY_ORDERING = ('id',)
+FORMATTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+}
+
+
+class ApiError(ValueError):
+    pass
+
+
+def api_view(view):
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            data, status = view(request, *args, **kwargs), 200
+        except ApiError as error:
+            data, status = {'error': str(error)}, 400
+        except PermissionDenied:
+            data, status = {'error': 'Доступ запрещён'}, 403
+        except Http404:
+            data, status = {'error': 'Не найдено'}, 404
+        return JsonResponse(data, status=status,
+                            json_dumps_params={'ensure_ascii': False})
+    return wrapper
+
+
+def parse_fields(request, allowed, default):
+    value = request.GET.get('fields', '')
+    fields = list(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields or list(default)
+
+
+def parse_int(request, name, default):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f'{name} должен быть целым числом')
+
+
+def parse_limit(request, default=API_PAGINATE_COUNT,
+                maximum=API_MAX_PAGE_SIZE):
+    return min(max(parse_int(request, 'limit', default), 1), maximum)
+
+
+def value_key(name, lookup):
+    return lookup if isinstance(lookup, str) else f'api_{name}'
+
+
+def select_fields(queryset, projection, fields, ordering=()):
+    # Поля сортировки нужны пагинатору, даже если клиент их не просил.
+    names = dict.fromkeys(
+        [*fields, *(name.lstrip('-') for name in ordering)])
+    lookups = {name: projection[name] for name in names}
+    return queryset.values(
+        *(lookup for lookup in lookups.values() if isinstance(lookup, str)),
+        **{value_key(name, lookup): lookup
+           for name, lookup in lookups.items()
+           if not isinstance(lookup, str)},
+    )
+
+
+def to_record(row, projection, fields):
+    record = {}
+    for name in fields:
+        value = row[value_key(name, projection[name])]
+        formatter = FORMATTERS.get(name)
+        record[name] = formatter(value) if formatter else value
+    return record
+
+
+def with_cursor(url, cursor):
+    if cursor is None:
+        return None
+    separator = '&' if '?' in url else '?'
+    return f'{url}{separator}cursor={cursor}'
+
+
+def make_page(queryset, projection, fields, ordering, per_page,
+              cursor=None, url=''):
+    paginator = CursorPaginator(
+        select_fields(queryset, projection, fields, ordering), per_page,
+        ordering=ordering)
+    page = paginator.get_page(cursor)
+    return {
+        'results': [to_record(row, projection, fields) for row in page],
+        'next': with_cursor(url, page.next_cursor),
+        'previous': with_cursor(url, page.previous_cursor),
+    }
+
+
+def request_page(request, queryset, projection, default_fields, ordering):
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    url = f'{request.path}?{params.urlencode()}' if params else request.path
+    return make_page(
+        queryset, projection,
+        parse_fields(request, projection, default_fields), ordering,
+        parse_limit(request), request.GET.get('cursor'), url)
+
+
+def post_page(request, posts):
+    return request_page(request, filter_published_posts(posts),
+                        POST_FIELDS, POST_LIST_FIELDS, POST_ORDERING)
+
+
+def get_visible_post(post_id):
+    return get_object_or_404(
+        filter_published_posts(Post.objects.filter(pk=post_id)).values(
+            'pk'))['pk']
+
+
+@api_view
+def post_list(request):
+    return post_page(request, Post.objects.all())
+
+
+@api_view
+def category_posts(request, category_slug):
+    return post_page(request, get_published_category(category_slug).posts)
+
+
+@api_view
+def author_posts(request, username):
+    return post_page(
+        request, get_object_or_404(User, username=username).posts)
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request, [*POST_FIELDS, 'comments'],
+                          [*POST_FIELDS, 'comments'])
+    post_fields = [name for name in fields if name != 'comments']
+    row = get_object_or_404(select_fields(
+        filter_published_posts(Post.objects.filter(pk=post_id)),
+        POST_FIELDS, post_fields, ordering=('id',)))
+    record = to_record(row, POST_FIELDS, post_fields)
+    if 'comments' in fields:
+        record['comments'] = make_page(
+            Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+            list(COMMENT_FIELDS), COMMENT_ORDERING, COMMENTS_PAGINATE_COUNT,
+            url=reverse('blog:api_post_comments', args=[post_id]))
+    return record
+
+
+@api_view
+def comment_list(request, post_id):
+    return request_page(
+        request, Comment.objects.filter(post_id=get_visible_post(post_id)),
+        COMMENT_FIELDS, COMMENT_FIELDS, COMMENT_ORDERING)
+
+
+@api_view
+def category_list(request):
+    return request_page(
+        request, Category.objects.filter(is_published=True),
+        CATEGORY_FIELDS, CATEGORY_FIELDS, CATEGORY_ORDERING)
+
+
+def check_changes_access(request):
+    # Журнал перечисляет и скрытые объекты: черновики, отложенные
+    # публикации, снятые категории. Он доступен персоналу и репликам
+    # с токеном BLOG_CHANGES_TOKEN.
+    if request.user.is_staff:
+        return
+    token = settings.BLOG_CHANGES_TOKEN
+    header = request.headers.get('Authorization', '')
+    if not token or not constant_time_compare(header, f'Bearer {token}'):
+        raise PermissionDenied
+
+
+@api_view
+def change_list(request):
+    check_changes_access(request)
+    changes, cursor, has_more = read_changes(
+        parse_int(request, 'since', 0),
+        parse_limit(request, CHANGES_PAGINATE_COUNT, CHANGES_PAGINATE_COUNT))
+    return {'results': changes, 'cursor': cursor, 'has_more': has_more}
@@ -0,0 +1,272 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, User, make_excerpt
+from .search import search_posts
+from .services import filter_published_posts, select_post_relations
+
+BATCH_SIZE = 10_000
+
+
+@contextmanager
+def benchmark_database():
+    # Отдельная файловая база с применёнными миграциями: рабочие данные
+    # не трогаются, а планы и тайминги ближе к боевым, чем у :memory:.
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST'].update(
+            NAME=str(Path(directory) / 'benchmark.sqlite3'),
+            SERIALIZE=False,
+        )
+        old_config = setup_databases(verbosity=0, interactive=False,
+                                     aliases={connection.alias})
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+
+SYLLABLES = ('ка', 'ло', 'ми', 'ну', 'ре', 'та', 'во', 'зе', 'си', 'пу',
+             'ры', 'ба', 'до', 'же', 'ль', 'ст', 'кр', 'ан', 'ом', 'ир')
+
+
+def make_vocabulary(rng, size=20_000):
+    return sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+                   for _ in range(size)})
+
+
+def seed_posts(count, authors=1000, categories=50, locations=100, seed=0):
+    rng = random.Random(seed)
+    now = timezone.now()
+    User.objects.bulk_create(
+        [User(username=f'author{i}') for i in range(authors)],
+        batch_size=BATCH_SIZE,
+    )
+    Category.objects.bulk_create(
+        [Category(title=f'Категория {i}', description='', slug=f'c{i}',
+                  is_published=i % 10 != 0)
+         for i in range(categories)],
+        batch_size=BATCH_SIZE,
+    )
+    Location.objects.bulk_create(
+        [Location(name=f'Место {i}') for i in range(locations)],
+        batch_size=BATCH_SIZE,
+    )
+    vocabulary = make_vocabulary(rng)
+    author_ids = list(User.objects.values_list('id', flat=True))
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    location_ids = list(Location.objects.values_list('id', flat=True))
+    for start in range(0, count, BATCH_SIZE):
+        texts = [' '.join(rng.choices(vocabulary, k=rng.randint(10, 150)))
+                 for _ in range(start, min(start + BATCH_SIZE, count))]
+        Post.objects.bulk_create([
+            Post(
+                title=f'Публикация {i}',
+                text=text,
+                excerpt=make_excerpt(text),
+                pub_date=now - timedelta(minutes=rng.randint(-10_000,
+                                                             2_000_000)),
+                is_published=rng.random() > 0.05,
+                author_id=rng.choice(author_ids),
+                category_id=rng.choice(category_ids),
+                location_id=rng.choice(location_ids),
+            )
+            for i, text in enumerate(texts, start)
+        ])
+
+
+def percentile(timings, share):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def measure(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def feed_querysets():
+    category = Category.objects.filter(is_published=True).first()
+    author = User.objects.first()
+    feeds = {
+        'index': filter_published_posts(Post.objects.all()),
+        'category': filter_published_posts(category.posts.all()),
+        'profile': author.posts.all(),
+    }
+    return {name: select_post_relations(posts)
+            for name, posts in feeds.items()}
+
+
+def report_feed_plans(write):
+    for name, queryset in feed_querysets().items():
+        timing = measure(lambda: list(queryset[:10]))
+        write(f'[{name}] {timing:.2f} ms')
+        for line in queryset[:10].explain().splitlines():
+            write(f'    {line}')
+
+
+def feed_plans(write, options):
+    with benchmark_database():
+        write(f'Генерация {options["posts"]} публикаций...')
+        seed_posts(options['posts'])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        write('С индексами:')
+        report_feed_plans(write)
+        with connection.schema_editor() as editor:
+            for index in Post._meta.indexes:
+                editor.remove_index(Post, index)
+        write('Без индексов:')
+        report_feed_plans(write)
+
+
+def index_latency(write, options):
+    rng = random.Random(0)
+    pages = [rng.choice((1, 1, 1, 2, 3, rng.randint(1, 100)))
+             for _ in range(options['requests'])]
+    with benchmark_database():
+        write(f'Генерация {options["posts"]} публикаций...')
+        seed_posts(options['posts'])
+        for strategy in ('exact', 'cached', 'none'):
+            cache.clear()
+            client = Client()
+            timings = []
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'],
+                                   BLOG_INDEX_COUNT=strategy):
+                for page in pages:
+                    started = time.perf_counter()
+                    client.get('/', {'page': page})
+                    timings.append((time.perf_counter() - started) * 1000)
+            write(f'[{strategy}] p50 {percentile(timings, 0.5):.1f} ms, '
+                  f'p95 {percentile(timings, 0.95):.1f} ms')
+
+
+def search_queries():
+    # Слова разной частоты: от встречающихся почти везде до редких.
+    words = ' '.join(Post.objects.order_by('id').values_list(
+        'text', flat=True)[:2000]).split()
+    frequency = Counter(words).most_common()
+    rare = Post.objects.order_by('-id').values_list('title', flat=True)[0]
+    return [frequency[0][0], frequency[len(frequency) // 10][0],
+            frequency[-1][0], rare.split()[-1], 'отсутствует']
+
+
+def search(write, options):
+    with benchmark_database():
+        write(f'Генерация {options["posts"]} публикаций...')
+        seed_posts(options['posts'])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        for word in search_queries():
+            like = select_post_relations(filter_published_posts(
+                Post.objects.filter(Q(title__icontains=word)
+                                    | Q(text__icontains=word))))
+            fts = search_posts(word).order_by('rank', 'id')
+            found = fts.count()
+            for label, queryset in (('icontains', like), ('fts5', fts)):
+                timing = measure(lambda: list(queryset[:10]), repeat=3)
+                write(f'[{word}: {found} совпадений] {label}: '
+                      f'{timing:.1f} ms')
+
+
+# Поведение SQLite по умолчанию: журнал отката и полная синхронизация.
+ROLLBACK_JOURNAL_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+}
+
+
+def run_for(operation, deadline, results):
+    timings = []
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:
+                errors += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        connection.close()
+    results.append((timings, errors))
+
+
+def mixed_load(readers, writers, duration, seed=0):
+    rng = random.Random(seed)
+    post_ids = list(Post.objects.values_list('id', flat=True)[:10_000])
+    author_ids = list(User.objects.values_list('id', flat=True))
+    feed = select_post_relations(filter_published_posts(Post.objects.all()))
+
+    def read():
+        list(feed[rng.randint(0, 50) * 10:][:10])
+
+    def write():
+        Comment.objects.create(text='Комментарий под нагрузкой',
+                               post_id=rng.choice(post_ids),
+                               author_id=rng.choice(author_ids))
+
+    results = {'read': [], 'write': []}
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=run_for,
+                         args=(operation, deadline, results[kind]))
+        for kind, operation, count in (('read', read, readers),
+                                       ('write', write, writers))
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def concurrency(write, options):
+    writers = max(1, options['threads'] // 4)
+    readers = max(1, options['threads'] - writers)
+    with benchmark_database():
+        write(f'Генерация {options["posts"]} публикаций...')
+        seed_posts(options['posts'])
+        write(f'{readers} читателей, {writers} писателей, '
+              f'{options["duration"]} с на режим')
+        for label, pragmas in (('rollback', ROLLBACK_JOURNAL_PRAGMAS),
+                               ('tuned', settings.SQLITE_PRAGMAS)):
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                connection.close()
+                connection.ensure_connection()
+                results = mixed_load(readers, writers, options['duration'])
+            for kind, outcomes in results.items():
+                timings = [value for part, _ in outcomes for value in part]
+                errors = sum(failed for _, failed in outcomes)
+                write(f'[{label}] {kind}: '
+                      f'{len(timings) / options["duration"]:.0f} оп/с, '
+                      f'p95 {percentile(timings or [0], 0.95):.1f} ms, '
+                      f'ошибок блокировки {errors}')
+
+
+SCENARIOS = {
+    'feed-plans': feed_plans,
+    'index-latency': index_latency,
+    'concurrency': concurrency,
+    'search': search,
+}
@@ -0,0 +1,35 @@
+import time
+
+from django.core.cache import cache
+
+TAG_KEY = 'blog:tag:{}'
+
+
+def _new_version():
+    # Версия от текущего времени не совпадёт с версиями, под которыми
+    # лежат старые записи, даже если счётчик тега был вытеснен из кэша.
+    return time.time_ns() // 1000
+
+
+def get_tag_versions(*tags):
+    keys = [TAG_KEY.format(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_tags(*tags):
+    for tag in tags:
+        key = TAG_KEY.format(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def make_key(prefix, tags, *parts):
+    versions = '.'.join(map(str, get_tag_versions(*tags)))
+    return ':'.join(['blog', prefix, versions, *map(str, parts)])
@@ -0,0 +1,51 @@
+from .constants import CHANGES_PAGINATE_COUNT
+from .models import Category, Change, ChangeAction, Comment, Location, Post
+
+# Модели, изменения которых попадают в журнал для внешних реплик.
+JOURNALED_MODELS = (Category, Location, Post, Comment)
+
+
+def record_changes(model, object_ids, action=ChangeAction.SAVE):
+    Change.objects.bulk_create(
+        Change(model_name=model._meta.model_name, object_id=object_id,
+               action=action)
+        for object_id in object_ids
+    )
+
+
+def record_instance_change(instance, action):
+    changes = [Change(model_name=instance._meta.model_name,
+                      object_id=instance.pk, action=action)]
+    if isinstance(instance, Comment):
+        # Комментарий меняет счётчик и updated_at своей публикации.
+        changes.append(Change(model_name=Post._meta.model_name,
+                              object_id=instance.post_id,
+                              action=ChangeAction.SAVE))
+    Change.objects.bulk_create(changes)
+
+
+def read_changes(since=0, limit=CHANGES_PAGINATE_COUNT):
+    """Возвращает записи журнала после курсора since и новый курсор.
+
+    Курсор — id последней записи: выборка идёт по первичному ключу,
+    и её стоимость зависит от числа новых изменений, а не от размера
+    таблиц. SQLite выполняет записи по одной, поэтому id растут
+    в порядке фиксации транзакций и строка не появится позади курсора.
+    """
+    changes = list(Change.objects.filter(id__gt=since).values(
+        'id', 'model_name', 'object_id', 'action', 'created_at',
+    )[:limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    cursor = changes[-1]['id'] if changes else since
+    return changes, cursor, has_more
+
+
+def squash_changes(changes):
+    # Для синхронизации важно только последнее действие над объектом.
+    latest = {}
+    for change in changes:
+        key = change['model_name'], change['object_id']
+        latest.pop(key, None)
+        latest[key] = change
+    return list(latest.values())
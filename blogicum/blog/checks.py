@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Кэш в памяти процесса: сброс тегов в run_scheduler не дойдёт
+# до веб-сервера.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def check_scheduled_publication_cache(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.BLOG_SCHEDULED_PUBLICATION and (
+            backend in PROCESS_LOCAL_CACHES):
+        return [Error(
+            'BLOG_SCHEDULED_PUBLICATION требует кэша, общего для '
+            'процессов.',
+            hint='Ключи лент тогда не зависят от времени, и публикации '
+                 'появятся только после сброса тегов планировщиком. '
+                 'Укажите в CACHES FileBasedCache, DatabaseCache '
+                 'или Memcached.',
+            id='blog.E001',
+        )]
+    return []
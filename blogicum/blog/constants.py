@@ -1,3 +1,29 @@
 LENGHT_CHARACTER_FIELDS = 256
 PAGINATE_COUNT = 10
 LIMIT_OUTPUT_STRING = 20
+FEED_TIME_BUCKET = 60
+FEED_CACHE_PAGES = 5
+FEED_COUNT_TIMEOUT = 300
+COMMENTS_PAGINATE_COUNT = 20
+CATEGORY_CACHE_TIMEOUT = 300
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+EXCERPT_WORDS = 10
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_QUALITY = 80
+IMAGE_DEFAULT_WIDTH = 640
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 60
+JOB_LOCK_TIMEOUT = 10 * 60
+WORKER_POLL_INTERVAL = 1
+AUTHOR_STATS_TIMEOUT = 5 * 60
+SEARCH_PAGINATE_COUNT = 10
+SEARCH_MAX_TERMS = 8
+SEARCH_SNIPPET_TOKENS = 16
+EXPORT_BATCH_SIZE = 1000
+FEED_ITEMS = 20
+API_PAGINATE_COUNT = 20
+API_MAX_PAGE_SIZE = 100
+CHANGES_PAGINATE_COUNT = 500
+SCHEDULED_FEED_CACHE_TIMEOUT = 10 * 60
+SCHEDULER_INTERVAL = 30
+SCHEDULER_LEASE_TIMEOUT = 90
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+from functools import wraps
+
+from django.core.cache import cache
+
+from .cache import make_key
+from .services import get_feed_cache_window
+
+CACHED_PAGES = ('index', 'category', 'profile')
+STATS_KEY = 'blog:page-cache:{}:{}'
+
+logger = logging.getLogger(__name__)
+
+
+def record_page_cache(name, outcome):
+    key = STATS_KEY.format(name, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+    logger.debug('Страничный кэш %s: %s', name, outcome)
+
+
+def get_page_cache_stats():
+    keys = {
+        (name, outcome): STATS_KEY.format(name, outcome)
+        for name in CACHED_PAGES for outcome in ('hit', 'miss')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        name: (values.get(keys[name, 'hit'], 0),
+               values.get(keys[name, 'miss'], 0))
+        for name in CACHED_PAGES
+    }
+
+
+def cache_anonymous_page(name, get_tags):
+    # Анонимные посетители получают одинаковый HTML, поэтому готовый ответ
+    # кэшируется по адресу страницы. Версии тегов в ключе сбрасываются
+    # сигналами при записи, а интервал ленты — раз в FEED_TIME_BUCKET,
+    # если видимость не хранится в is_live.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            bucket, timeout = get_feed_cache_window()
+            key = make_key(f'page:{name}', get_tags(**kwargs), bucket, path)
+            response = cache.get(key)
+            if response is not None:
+                record_page_cache(name, 'hit')
+                response['X-Page-Cache'] = 'hit'
+                return response
+            record_page_cache(name, 'miss')
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            def store(response):
+                cache.set(key, response, timeout)
+
+            if callable(getattr(response, 'render', None)):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
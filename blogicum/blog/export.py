@@ -0,0 +1,116 @@
+import csv
+import json
+from io import StringIO
+
+from .constants import EXPORT_BATCH_SIZE
+from .models import Category, Comment, Location, Post, User
+
+# Формат совпадает с тем, что читает manage.py import_content.
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name',
+               'date_joined')
+SITE_USER_FIELDS = (*USER_FIELDS, 'password')
+CATEGORY_FIELDS = ('slug', 'title', 'description', 'is_published',
+                   'created_at')
+LOCATION_FIELDS = ('name', 'is_published', 'created_at')
+POST_FIELDS = ('id', 'title', 'text', 'pub_date', 'is_published',
+               'created_at', 'author__username', 'category__slug',
+               'location__name')
+COMMENT_FIELDS = ('id', 'text', 'post_id', 'author__username',
+                  'created_at')
+RENAMED = {
+    'author__username': 'author',
+    'category__slug': 'category',
+    'location__name': 'location',
+    'post_id': 'post',
+}
+CSV_COLUMNS = ('type', 'id', 'username', 'email', 'first_name', 'last_name',
+               'date_joined', 'password', 'slug', 'name', 'title',
+               'description', 'text', 'pub_date', 'is_published',
+               'created_at', 'author', 'category', 'location', 'post')
+
+
+def iter_keyset(queryset, fields, batch_size=EXPORT_BATCH_SIZE):
+    # Пачки по первичному ключу: каждый запрос начинается с места, где
+    # закончился предыдущий, и в памяти не больше одной пачки.
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk)
+        rows = list(batch.values('pk', *fields)[:batch_size])
+        if not rows:
+            return
+        last_pk = rows[-1]['pk']
+        yield from rows
+
+
+def to_record(record_type, row, fields):
+    record = {'type': record_type}
+    for field in fields:
+        value = row[field]
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        record[RENAMED.get(field, field)] = value
+    return record
+
+
+def iter_records(record_type, queryset, fields):
+    for row in iter_keyset(queryset, fields):
+        yield to_record(record_type, row, fields)
+
+
+def site_records():
+    yield from iter_records('user', User.objects.all(), SITE_USER_FIELDS)
+    yield from iter_records('category', Category.objects.all(),
+                            CATEGORY_FIELDS)
+    yield from iter_records('location', Location.objects.all(),
+                            LOCATION_FIELDS)
+    yield from iter_records('post', Post.objects.all(), POST_FIELDS)
+    yield from iter_records('comment', Comment.objects.all(),
+                            COMMENT_FIELDS)
+
+
+def author_records(author):
+    # Архив автора: его публикации и его комментарии к ним, а также
+    # категории и места этих публикаций, чтобы архив можно было
+    # импортировать. Комментарии к чужим публикациям не попадают:
+    # импорт отклонил бы их без самих публикаций.
+    posts = Post.objects.filter(author=author)
+    yield from iter_records('user', User.objects.filter(pk=author.pk),
+                            USER_FIELDS)
+    yield from iter_records(
+        'category', Category.objects.filter(
+            pk__in=posts.values('category_id')), CATEGORY_FIELDS)
+    yield from iter_records(
+        'location', Location.objects.filter(
+            pk__in=posts.values('location_id')), LOCATION_FIELDS)
+    yield from iter_records('post', posts, POST_FIELDS)
+    yield from iter_records(
+        'comment', Comment.objects.filter(author=author, post__author=author),
+        COMMENT_FIELDS)
+
+
+def jsonl_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def csv_lines(records):
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for record in records:
+        writer.writerow({key: '' if value is None else value
+                         for key, value in record.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+WRITERS = {
+    'jsonl': (jsonl_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
@@ -0,0 +1,134 @@
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .cache import get_tag_versions
+from .constants import FEED_ITEMS
+from .models import Post, User
+from .services import (filter_published_posts, get_published_category,
+                       select_post_relations)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Блогикум: новые публикации'
+    description = 'Последние публикации всех авторов.'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def get_cache_tags(self, obj):
+        return ['feeds', 'index']
+
+    def get_visible_posts(self, obj):
+        return filter_published_posts(self.get_posts(obj))
+
+    def items(self, obj):
+        return select_post_relations(self.get_visible_posts(obj))[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    description = 'Последние публикации в категории.'
+
+    def get_object(self, request, category_slug):
+        return get_published_category(category_slug)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+    def get_cache_tags(self, obj):
+        return ['feeds', f'category:{obj.pk}']
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    description = 'Последние публикации автора.'
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум: публикации @{obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+    def get_cache_tags(self, obj):
+        return ['feeds', f'profile:{obj.username}']
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+
+def conditional_feed(feed):
+    """Оборачивает ленту в условный GET.
+
+    ETag зависит от версий тегов кэша ленты и от публикаций, попадающих
+    в ленту, Last-Modified — от самой поздней даты публикации или правки
+    среди них. На повторный запрос агрегатора с совпадающим ETag лента
+    не строится вовсе.
+    """
+    def feed_items(request, **kwargs):
+        if not hasattr(request, 'feed_items_state'):
+            obj = feed.get_object(request, **kwargs)
+            request.feed_items_state = (obj, list(feed.get_visible_posts(
+                obj).order_by('-pub_date', '-id').values_list(
+                    'pk', 'pub_date', 'updated_at')[:FEED_ITEMS]))
+        return request.feed_items_state
+
+    def etag(request, **kwargs):
+        obj, items = feed_items(request, **kwargs)
+        versions = get_tag_versions(*feed.get_cache_tags(obj))
+        state = f'{type(feed).__name__}:{versions}:{items}'
+        return hashlib.md5(state.encode()).hexdigest()
+
+    def last_modified(request, **kwargs):
+        _, items = feed_items(request, **kwargs)
+        # Отложенная публикация появляется в ленте позже своей правки.
+        return max((max(dates) for _, *dates in items), default=None)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)(feed)
@@ -0,0 +1,105 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .constants import (IMAGE_DEFAULT_WIDTH, IMAGE_QUALITY,
+                        IMAGE_VARIANT_WIDTHS)
+
+VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+}
+
+
+def variant_widths(width):
+    widths = [size for size in IMAGE_VARIANT_WIDTHS if size < width]
+    if len(widths) < len(IMAGE_VARIANT_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def encode_variant(image, width, image_format):
+    variant = image.copy()
+    variant.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(buffer, image_format, quality=IMAGE_QUALITY, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(image_file, storage=default_storage):
+    """Сохраняет уменьшенные копии изображения рядом с оригиналом.
+
+    Возвращает словарь вида {'webp': [[ширина, путь], ...], ...};
+    если файл не удаётся прочитать как изображение — пустой словарь.
+    """
+    try:
+        image_file.open('rb')
+        with Image.open(image_file) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return {}
+    finally:
+        image_file.close()
+    path = PurePosixPath(image_file.name)
+    variants = {}
+    for extension, image_format in VARIANT_FORMATS.items():
+        variants[extension] = [
+            [width, storage.save(
+                str(path.parent / 'variants'
+                    / f'{path.stem}-{width}.{extension}'),
+                encode_variant(image, width, image_format),
+            )]
+            for width in variant_widths(image.width)
+        ]
+    return variants
+
+
+def delete_variants(variants, storage=default_storage):
+    for sizes in variants.values():
+        for _, name in sizes:
+            storage.delete(name)
+
+
+def variant_srcset(sizes, storage=default_storage):
+    return ', '.join(f'{storage.url(name)} {width}w' for width, name in sizes)
+
+
+def variant_url(sizes, width=IMAGE_DEFAULT_WIDTH, storage=default_storage):
+    # Для браузеров без srcset: наименьшая копия не уже width.
+    name = next((name for size, name in sizes if size >= width),
+                sizes[-1][1])
+    return storage.url(name)
+
+
+def clean_original(image_file, storage=default_storage):
+    """Проверяет оригинал и перезаписывает его без EXIF.
+
+    Поворот из EXIF применяется к пикселям, поэтому ориентация
+    сохраняется. Возвращает False, если файл не является изображением.
+    """
+    try:
+        image_file.open('rb')
+        with Image.open(image_file) as source:
+            source.verify()
+        image_file.open('rb')
+        with Image.open(image_file) as source:
+            if not source.getexif():
+                return True
+            image_format = source.format
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return False
+    finally:
+        image_file.close()
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=IMAGE_QUALITY)
+    storage.delete(image_file.name)
+    storage.save(image_file.name, ContentFile(buffer.getvalue()))
+    return True
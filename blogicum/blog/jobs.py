@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .constants import JOB_LOCK_TIMEOUT, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+from .images import clean_original, generate_variants
+from .models import ImageStatus, Job, JobStatus, Post
+
+TASKS = {}
+# Задача → обработчик, который вызывается после последней неудачной
+# попытки с тем же payload.
+FAILURE_HANDLERS = {}
+
+
+def task(func):
+    TASKS[func.__name__] = func
+    return func
+
+
+def on_failure(name):
+    def decorator(func):
+        FAILURE_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    return Job.objects.create(name=name, payload=payload)
+
+
+def claim_job():
+    # Без SELECT ... FOR UPDATE: задачу забирает тот, чей условный UPDATE
+    # изменил строку. Зависшие после падения воркера задачи берутся снова.
+    now = timezone.now()
+    ready = Q(status=JobStatus.PENDING, run_after__lte=now) | Q(
+        status=JobStatus.RUNNING,
+        locked_at__lt=now - timedelta(seconds=JOB_LOCK_TIMEOUT),
+    )
+    while True:
+        job = Job.objects.filter(ready).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(
+            pk=job.pk, status=job.status, locked_at=job.locked_at,
+        ).update(status=JobStatus.RUNNING, locked_at=now,
+                 attempts=F('attempts') + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job):
+    try:
+        TASKS[job.name](**job.payload)
+    except Exception as error:
+        job.last_error = f'{type(error).__name__}: {error}'
+        if job.attempts < JOB_MAX_ATTEMPTS:
+            job.status = JobStatus.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=JOB_RETRY_DELAY * job.attempts)
+        else:
+            job.status = JobStatus.FAILED
+            if job.name in FAILURE_HANDLERS:
+                FAILURE_HANDLERS[job.name](**job.payload)
+    else:
+        job.status = JobStatus.DONE
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_after', 'locked_at',
+                            'last_error'])
+    return job
+
+
+def run_pending_jobs(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+@task
+def process_post_image(post_id, image):
+    post = Post.objects.filter(pk=post_id, image=image).first()
+    if post is None:
+        # Публикацию удалили или фото успели заменить: для нового фото
+        # поставлена своя задача.
+        return
+    if clean_original(post.image):
+        post.image_variants = generate_variants(post.image)
+    post.image_status = (ImageStatus.READY if post.image_variants
+                         else ImageStatus.FAILED)
+    post.save(update_fields=['image_variants', 'image_status'])
+
+
+@on_failure('process_post_image')
+def mark_post_image_failed(post_id, image):
+    post = Post.objects.filter(pk=post_id, image=image,
+                               image_status=ImageStatus.PROCESSING).first()
+    if post is not None:
+        # save(), а не update(): сигналы сбросят кэш карточки.
+        post.image_status = ImageStatus.FAILED
+        post.save(update_fields=['image_status'])
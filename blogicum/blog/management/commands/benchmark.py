@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = ('Запускает сценарий нагрузочного замера на временной базе '
+            'с синтетическими данными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--posts', type=int, default=1_000_000,
+                            help='Количество генерируемых публикаций.')
+        parser.add_argument('--requests', type=int, default=300,
+                            help='Количество HTTP-запросов в замере.')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Число потоков в конкурентном замере.')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Длительность конкурентного замера, с.')
+
+    def handle(self, *args, **options):
+        SCENARIOS[options['scenario']](self.stdout.write, options)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии фото для публикаций, '
+            'загруженных до появления конвейера изображений.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').filter(image_variants={})
+        built = 0
+        for post in posts.only('pk', 'image').iterator():
+            variants = generate_variants(post.image)
+            if variants:
+                Post.objects.filter(pk=post.pk).update(image_variants=variants)
+                built += 1
+        self.stdout.write(f'Обработано публикаций: {built}')
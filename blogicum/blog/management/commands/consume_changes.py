@@ -0,0 +1,71 @@
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog.changes import read_changes, squash_changes
+from blog.constants import CHANGES_PAGINATE_COUNT, WORKER_POLL_INTERVAL
+
+
+class Command(BaseCommand):
+    help = ('Читает журнал изменений после сохранённого курсора и выводит '
+            'в JSONL последнее действие над каждым объектом — для реплик '
+            'и поисковых индексов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=int,
+                            help='Курсор, с которого начать чтение.')
+        parser.add_argument('--state',
+                            help='Файл, в котором хранится курсор между '
+                                 'запусками.')
+        parser.add_argument('--url',
+                            help='Адрес /api/changes/ другого сервера; '
+                                 'по умолчанию журнал читается из базы.')
+        parser.add_argument('--token', default=settings.BLOG_CHANGES_TOKEN,
+                            help='Токен доступа к журналу другого сервера.')
+        parser.add_argument('--limit', type=int,
+                            default=CHANGES_PAGINATE_COUNT)
+        parser.add_argument('--follow', action='store_true',
+                            help='Не выходить, а ждать новых изменений.')
+        parser.add_argument('--interval', type=float,
+                            default=WORKER_POLL_INTERVAL,
+                            help='Пауза между опросами журнала, секунды.')
+
+    def handle(self, *args, **options):
+        state = Path(options['state']) if options['state'] else None
+        since = options['since']
+        if since is None:
+            since = int(state.read_text()) if state and state.exists() else 0
+        while True:
+            changes, since, has_more = self.fetch(options, since)
+            for change in squash_changes(changes):
+                self.stdout.write(json.dumps(
+                    change, cls=DjangoJSONEncoder, ensure_ascii=False))
+            # Курсор сохраняется после вывода пачки: при сбое пачка
+            # будет прочитана ещё раз, а не потеряна.
+            if state:
+                state.write_text(str(since))
+            if has_more:
+                continue
+            if not options['follow']:
+                return
+            time.sleep(options['interval'])
+
+    def fetch(self, options, since):
+        if not options['url']:
+            return read_changes(since, options['limit'])
+        query = urlencode({'since': since, 'limit': options['limit']})
+        headers = ({'Authorization': f"Bearer {options['token']}"}
+                   if options['token'] else {})
+        request = Request(f"{options['url']}?{query}", headers=headers)
+        try:
+            with urlopen(request) as response:
+                data = json.load(response)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось получить изменения: {error}')
+        return data['results'], data['cursor'], data['has_more']
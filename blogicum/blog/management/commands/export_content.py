@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.export import WRITERS, site_records
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает пользователей, категории, места, публикации '
+            'и комментарии в JSONL или CSV, совместимом с import_content.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(WRITERS),
+                            default='jsonl')
+        parser.add_argument('--output', default='-',
+                            help='Путь к файлу или «-» для stdout.')
+
+    def handle(self, *args, **options):
+        write_lines, _ = WRITERS[options['format']]
+        lines = write_lines(site_records())
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as stream:
+            stream.writelines(lines)
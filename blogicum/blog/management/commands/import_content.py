@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import READERS, ContentImporter
+
+
+class Command(BaseCommand):
+    help = ('Потоково импортирует пользователей, категории, места, '
+            'публикации и комментарии из JSONL или CSV.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='Формат; по умолчанию — по расширению.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Записей одного типа в транзакции.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or Path(path).suffix.lstrip('.')
+        if file_format not in READERS:
+            raise CommandError('Укажите формат через --format.')
+        importer = ContentImporter(options['batch_size'],
+                                   progress=self.report)
+        if path == '-':
+            importer.run(READERS[file_format](sys.stdin))
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                importer.run(READERS[file_format](stream))
+        for line_number, message in importer.errors:
+            prefix = f'Строка {line_number}: ' if line_number else ''
+            self.stderr.write(prefix + message)
+
+    def report(self, processed):
+        self.stdout.write(', '.join(
+            f'{record_type}: {count}'
+            for record_type, count in processed.items()
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.decorators import get_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи страничного кэша анонимных лент.'
+
+    def handle(self, *args, **options):
+        for name, (hits, misses) in get_page_cache_stats().items():
+            total = hits + misses
+            rate = hits / total * 100 if total else 0
+            self.stdout.write(
+                f'{name}: попаданий {hits}, промахов {misses}, '
+                f'доля попаданий {rate:.1f}%')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.services import recount_comment_counts
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает Post.comment_count по таблице комментариев '
+            'и исправляет расхождения.')
+
+    def handle(self, *args, **options):
+        repaired = recount_comment_counts()
+        self.stdout.write(f'Исправлено публикаций: {repaired}')
@@ -0,0 +1,43 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import SCHEDULER_INTERVAL, SCHEDULER_LEASE_TIMEOUT
+from blog.scheduler import (acquire_lease, publish_due_posts, release_lease,
+                            seconds_until_next)
+
+
+class Command(BaseCommand):
+    help = ('Включает отложенные публикации в ленты в момент их pub_date. '
+            'Из нескольких запущенных планировщиков работает один — '
+            'тот, кто держит аренду в базе данных.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Опубликовать наступившие и выйти.')
+        parser.add_argument('--interval', type=float,
+                            default=SCHEDULER_INTERVAL,
+                            help='Наибольшая пауза между проверками, '
+                                 'секунды.')
+
+    def handle(self, *args, **options):
+        owner = f'{socket.gethostname()}:{os.getpid()}'
+        # Аренда переживает несколько пауз, иначе её заберёт соседний
+        # планировщик, пока этот спит.
+        lease_timeout = max(SCHEDULER_LEASE_TIMEOUT, 3 * options['interval'])
+        try:
+            while True:
+                delay = options['interval']
+                if acquire_lease(owner, timeout=lease_timeout):
+                    published = publish_due_posts()
+                    if published:
+                        self.stdout.write(
+                            f'Обновлена видимость публикаций: {published}')
+                    delay = seconds_until_next(interval=delay)
+                if options['once']:
+                    return
+                time.sleep(delay)
+        finally:
+            release_lease(owner)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import WORKER_POLL_INTERVAL
+from blog.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди в базе данных: '
+            'обработку загруженных фото и другие.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить накопившиеся задачи и выйти.')
+        parser.add_argument('--interval', type=float,
+                            default=WORKER_POLL_INTERVAL,
+                            help='Пауза между опросами очереди, секунды.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending_jobs()
+            if processed:
+                self.stdout.write(f'Выполнено задач: {processed}')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:17
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator(BATCH_SIZE):
+        post.excerpt = Truncator(
+            Truncator(post.text).words(10, truncate=' …')).chars(256)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=256, verbose_name='Задача')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Параметры')),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'В очереди'), (1, 'Выполняется'), (2, 'Выполнена'), (3, 'Ошибка')], default=0, verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Не раньше')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('run_after', 'id'),
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Готово'), (1, 'Обрабатывается'), (2, 'Ошибка')], default=0, editable=False, verbose_name='Обработка фото'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ),
+    ]
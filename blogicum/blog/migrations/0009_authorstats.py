@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0008_job_post_image_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user', verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев к публикациям')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Последняя публикация')),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Пересчитано')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# SQL зафиксирован на момент миграции и не зависит от blog.search:
+# последующие изменения индекса оформляются новыми миграциями. IF NOT
+# EXISTS нужен потому, что индекс восстанавливает и обработчик
+# post_migrate, в том числе после отката к более ранней миграции.
+INSTALL_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO blog_post_fts(blog_post_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_delete AFTER DELETE ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_update "
+    "AFTER UPDATE OF title, text ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')",
+)
+UNINSTALL_SQL = (
+    "DROP TRIGGER IF EXISTS blog_post_fts_insert",
+    "DROP TRIGGER IF EXISTS blog_post_fts_delete",
+    "DROP TRIGGER IF EXISTS blog_post_fts_update",
+    "DROP TABLE IF EXISTS blog_post_fts",
+)
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_authorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(INSTALL_SQL),
+                             run_sqlite(UNINSTALL_SQL)),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=32, verbose_name='Модель')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Идентификатор объекта')),
+                ('action', models.CharField(choices=[('save', 'Изменение'), ('delete', 'Удаление')], max_length=8, verbose_name='Действие')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('id',),
+            },
+        ),
+    ]
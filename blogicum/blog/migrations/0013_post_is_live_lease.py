@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def fill_is_live(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=django.utils.timezone.now(),
+    ).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lease',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Назначение')),
+                ('owner', models.CharField(blank=True, max_length=128, verbose_name='Владелец')),
+                ('expires_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Действует до')),
+            ],
+            options={
+                'verbose_name': 'аренда',
+                'verbose_name_plural': 'Аренды',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Показывается в лентах'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', False), ('is_published', True)), fields=['pub_date'], name='post_scheduled_idx'),
+        ),
+        migrations.RunPython(fill_is_live, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,50 @@
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
+from .constants import PAGINATE_COUNT
 from .models import Post, Comment
 from .forms import PostForm, CommentForm
+from .cache import make_key
+from .services import get_paginated_posts
+
+
+class FeedPaginationMixin:
+    paginate_by = PAGINATE_COUNT
+    # Теги, при сбросе которых устаревает кэшированное число записей.
+    cache_tags = ['feeds']
+
+    def get_cache_tags(self):
+        return list(self.cache_tags)
+
+    def get_count_strategy(self):
+        return settings.BLOG_FEED_COUNT
+
+    def get_page(self, queryset, page_size):
+        return get_paginated_posts(
+            self.request, queryset, page_size,
+            count_key=make_key('count', self.get_cache_tags()),
+            count_strategy=self.get_count_strategy(),
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        page = self.get_page(queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
 
 
 class AuthorRequiredCommentMixin(UserPassesTestMixin):
 
+    def get_object(self, queryset=None):
+        # Проверка прав, форма и удаление используют один и тот же объект.
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
     def test_func(self):
-        return self.request.user == self.get_object().author
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(AuthorRequiredCommentMixin, LoginRequiredMixin):
@@ -18,11 +53,12 @@ class PostMixin(AuthorRequiredCommentMixin, LoginRequiredMixin):
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('location')
+
     def get_context_data(self, **kwargs):
-        return super().get_context_data(
-            form=self.form_class(instance=self.get_object()),
-            **kwargs,
-        )
+        kwargs.setdefault('form', self.form_class(instance=self.object))
+        return super().get_context_data(**kwargs)
 
     def handle_no_permission(self):
         return redirect('blog:post_detail', self.kwargs[self.pk_url_kwarg])
@@ -1,11 +1,22 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from .constants import LENGHT_CHARACTER_FIELDS, LIMIT_OUTPUT_STRING
+from .constants import (EXCERPT_WORDS, LENGHT_CHARACTER_FIELDS,
+                        LIMIT_OUTPUT_STRING)
+from .images import delete_variants, generate_variants
 
 User = get_user_model()
 
 
+def make_excerpt(text):
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(LENGHT_CHARACTER_FIELDS)
+
+
 class IsPublishedCreatedAt(models.Model):
     is_published = models.BooleanField(
         'Опубликовано',
@@ -16,6 +27,10 @@ class IsPublishedCreatedAt(models.Model):
         'Добавлено',
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True,
+    )
 
     class Meta:
         abstract = True
@@ -52,15 +67,39 @@ class Category(IsPublishedCreatedAt):
         return self.title[:LIMIT_OUTPUT_STRING]
 
 
+class ImageStatus(models.IntegerChoices):
+    READY = 0, 'Готово'
+    PROCESSING = 1, 'Обрабатывается'
+    FAILED = 2, 'Ошибка'
+
+
 class Post(IsPublishedCreatedAt):
     title = models.CharField('Заголовок', max_length=LENGHT_CHARACTER_FIELDS)
     text = models.TextField('Текст')
+    excerpt = models.CharField(
+        'Анонс',
+        max_length=LENGHT_CHARACTER_FIELDS,
+        blank=True,
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
                   'можно делать отложенные публикации.'
     )
     image = models.ImageField('Фото', upload_to='blog_image', blank=True)
+    image_variants = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    image_status = models.PositiveSmallIntegerField(
+        'Обработка фото',
+        choices=ImageStatus.choices,
+        default=ImageStatus.READY,
+        editable=False,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -82,15 +121,125 @@ class Post(IsPublishedCreatedAt):
         verbose_name='Категория',
         related_name='posts'
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    is_live = models.BooleanField(
+        'Показывается в лентах',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_live=False),
+                name='post_scheduled_idx',
+            ),
+        )
+
+    DERIVED_FIELDS = (
+        ('text', 'excerpt'),
+        ('image', 'image_variants'),
+        ('image', 'image_status'),
+        ('is_published', 'is_live'),
+        ('pub_date', 'is_live'),
+        ('category', 'is_live'),
+    )
+    LIVE_SOURCES = ('is_published', 'pub_date', 'category_id')
 
     def __str__(self):
         return self.title[:LIMIT_OUTPUT_STRING]
 
+    @property
+    def image_processing(self):
+        return self.image_status == ImageStatus.PROCESSING
+
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        if 'text' not in deferred:
+            self.excerpt = make_excerpt(self.text)
+        image_changed = (
+            'image' not in deferred and self.update_image_variants())
+        if not deferred.intersection(self.LIVE_SOURCES) and (
+                update_fields is None
+                or 'is_live' in self.derived_fields(update_fields)):
+            self.is_live = self.compute_is_live()
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields,
+                *self.derived_fields(update_fields),
+                'updated_at',
+            }
+        super().save(*args, **kwargs)
+        if image_changed and self.image_status == ImageStatus.PROCESSING:
+            Job.objects.create(
+                name='process_post_image',
+                payload={'post_id': self.pk, 'image': self.image.name},
+            )
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            'image': self.image.name,
+        }
+
+    def derived_fields(self, update_fields):
+        return {derived for source, derived in self.DERIVED_FIELDS
+                if source in update_fields}
+
+    def compute_is_live(self, now=None):
+        # То же условие, что в services.live_posts_q.
+        if not self.is_published or self.category_id is None:
+            return False
+        if self.pub_date > (now or timezone.now()):
+            return False
+        return self.category.is_published
+
+    def update_image_variants(self):
+        loaded = getattr(self, '_loaded_values', {})
+        if self.image and not self.image._committed:
+            self.image.save(self.image.name, self.image.file, save=False)
+        elif self.image.name == loaded.get('image', self.image.name):
+            return False
+        if self.pk is not None:
+            # Копии берутся из базы: их могла записать фоновая задача
+            # уже после загрузки этого экземпляра.
+            delete_variants(Post.objects.filter(pk=self.pk).values_list(
+                'image_variants', flat=True).first() or {})
+        self.image_variants = {}
+        self.image_status = ImageStatus.READY
+        if self.image and settings.BLOG_IMAGE_PROCESSING == 'inline':
+            self.image_variants = generate_variants(self.image)
+        elif self.image:
+            self.image_status = ImageStatus.PROCESSING
+        return True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Comment(models.Model):
     text = models.TextField('Комментарий',
@@ -118,3 +267,103 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:LIMIT_OUTPUT_STRING]
+
+
+class JobStatus(models.IntegerChoices):
+    PENDING = 0, 'В очереди'
+    RUNNING = 1, 'Выполняется'
+    DONE = 2, 'Выполнена'
+    FAILED = 3, 'Ошибка'
+
+
+class Job(models.Model):
+    name = models.CharField('Задача', max_length=LENGHT_CHARACTER_FIELDS)
+    payload = models.JSONField('Параметры', default=dict, blank=True)
+    status = models.PositiveSmallIntegerField(
+        'Состояние',
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Не раньше', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(fields=('status', 'run_after'),
+                         name='job_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Автор',
+        related_name='stats'
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    comment_count = models.PositiveIntegerField(
+        'Комментариев к публикациям', default=0)
+    last_post_date = models.DateTimeField(
+        'Последняя публикация', null=True, blank=True)
+    refreshed_at = models.DateTimeField('Пересчитано', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class ChangeAction(models.TextChoices):
+    SAVE = 'save', 'Изменение'
+    DELETE = 'delete', 'Удаление'
+
+
+class Change(models.Model):
+    model_name = models.CharField('Модель', max_length=32)
+    object_id = models.PositiveIntegerField('Идентификатор объекта')
+    action = models.CharField(
+        'Действие',
+        max_length=8,
+        choices=ChangeAction.choices,
+    )
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = 'изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.model_name} #{self.object_id}: {self.action}'
+
+
+class Lease(models.Model):
+    name = models.CharField('Назначение', max_length=64, primary_key=True)
+    owner = models.CharField('Владелец', max_length=128, blank=True)
+    expires_at = models.DateTimeField('Действует до', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'аренда'
+        verbose_name_plural = 'Аренды'
+
+    def __str__(self):
+        return f'{self.name}: {self.owner}'
@@ -0,0 +1,242 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def validate_page_number(number):
+    # Номер проверяется только на целое ≥ 1: пуста ли страница, решает
+    # выборка, а не число страниц.
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        raise PageNotAnInteger('Номер страницы должен быть целым числом')
+    if number < 1:
+        raise EmptyPage('Номер страницы меньше 1')
+    return number
+
+
+class CachedCountPaginator(Paginator):
+    # COUNT(*) выполняется один раз и живёт в кэше до истечения timeout
+    # или до смены версии ключа при записи. Сохранённое число может
+    # отставать от базы, поэтому номер страницы с ним не сверяется:
+    # если за страницей есть записи, число поправляется для запроса.
+
+    def __init__(self, object_list, per_page, count_key, count_timeout,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.count_timeout = count_timeout
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.count_key)
+        if count is None:
+            count = super().count
+            cache.set(self.count_key, count, self.count_timeout)
+        return count
+
+    def validate_number(self, number):
+        return validate_page_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if number < self.num_pages:
+            # Срез остаётся ленивым: его может подменить кэш страницы.
+            return self._get_page(
+                self.object_list[bottom:bottom + self.per_page], number, self)
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage('На странице нет результатов')
+        if bottom + len(items) > self.count:
+            self.count = bottom + len(items)
+            self.__dict__.pop('num_pages', None)
+            self.__dict__.pop('page_range', None)
+        return self._get_page(items[:self.per_page], number, self)
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            pass
+        # Завышенное число в кэше может указывать на пустую страницу.
+        try:
+            return self.page(self.num_pages)
+        except EmptyPage:
+            return self.page(1)
+
+
+class UncountedPaginator(Paginator):
+    # Обходится без COUNT(*): о следующей странице известно только то,
+    # что за текущей есть хотя бы одна запись.
+    uncounted = True
+
+    def validate_number(self, number):
+        return validate_page_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage('На странице нет результатов')
+        self.num_pages = number + (len(items) > self.per_page)
+        return self._get_page(items[:self.per_page], number, self)
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except (PageNotAnInteger, EmptyPage):
+            return self.page(1)
+
+
+class CursorPage:
+    keyset = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинатор: страница ищется по значениям полей сортировки.
+
+    Стоимость запроса не зависит от глубины страницы: вместо OFFSET
+    и COUNT(*) выбирается per_page + 1 строк после (или до) курсора.
+    Последнее поле ordering должно быть уникальным (обычно id).
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    @property
+    def fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def get_page(self, cursor=None):
+        position = self.decode_cursor(cursor)
+        if position is None:
+            items, has_more = self._fetch(Q(), self.ordering)
+            return self._page(items, next_more=has_more, previous_more=False)
+        direction, values = position
+        if direction == NEXT:
+            items, has_more = self._fetch(
+                self._seek(values, reverse=False), self.ordering)
+            return self._page(items, next_more=has_more, previous_more=True)
+        items, has_more = self._fetch(
+            self._seek(values, reverse=True), self._reversed_ordering())
+        items.reverse()
+        return self._page(items, next_more=True, previous_more=has_more)
+
+    def encode_cursor(self, item, direction):
+        values = [self._serialize(self._value(item, name))
+                  for name in self.fields]
+        token = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            if len(values) != len(self.fields):
+                return None
+            return direction, [
+                self._output_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError,
+                FieldDoesNotExist):
+            return None
+
+    def _output_field(self, name):
+        # Сортировать можно и по аннотации, например по рангу поиска.
+        annotations = self.object_list.query.annotations
+        if name in annotations:
+            return annotations[name].output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def _fetch(self, condition, ordering):
+        items = list(
+            self.object_list.filter(condition).order_by(*ordering)[
+                :self.per_page + 1]
+        )
+        return items[:self.per_page], len(items) > self.per_page
+
+    def _page(self, items, next_more, previous_more):
+        next_cursor = previous_cursor = None
+        if items and next_more:
+            next_cursor = self.encode_cursor(items[-1], NEXT)
+        if items and previous_more:
+            previous_cursor = self.encode_cursor(items[0], PREVIOUS)
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+    def _seek(self, values, reverse):
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    @staticmethod
+    def _value(item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
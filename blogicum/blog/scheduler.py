@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .constants import SCHEDULER_INTERVAL, SCHEDULER_LEASE_TIMEOUT
+from .models import Lease, Post
+from .services import sync_live_state
+
+LEASE_NAME = 'publication-scheduler'
+
+
+def acquire_lease(owner, name=LEASE_NAME, timeout=SCHEDULER_LEASE_TIMEOUT):
+    # Как и в claim_job, аренду получает тот, чей условный UPDATE изменил
+    # строку: свою аренду владелец продлевает, чужую — забирает только
+    # после истечения.
+    now = timezone.now()
+    Lease.objects.get_or_create(name=name, defaults={'expires_at': now})
+    return bool(Lease.objects.filter(
+        Q(owner=owner) | Q(expires_at__lte=now), name=name,
+    ).update(owner=owner, expires_at=now + timedelta(seconds=timeout)))
+
+
+def release_lease(owner, name=LEASE_NAME):
+    Lease.objects.filter(name=name, owner=owner).update(
+        expires_at=timezone.now())
+
+
+def scheduled_posts():
+    return Post.objects.filter(is_published=True, is_live=False)
+
+
+def publish_due_posts(now=None):
+    now = now or timezone.now()
+    return sync_live_state(scheduled_posts().filter(pub_date__lte=now), now)
+
+
+def seconds_until_next(now=None, interval=SCHEDULER_INTERVAL):
+    # Планировщик просыпается к ближайшей pub_date, но не реже interval:
+    # публикацию могли запланировать на более ранний срок.
+    now = now or timezone.now()
+    next_date = scheduled_posts().filter(pub_date__gt=now).aggregate(
+        next_date=Min('pub_date'))['next_date']
+    if next_date is None:
+        return interval
+    return max(min((next_date - now).total_seconds(), interval), 0)
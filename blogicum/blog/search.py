@@ -0,0 +1,119 @@
+import re
+
+from django.db.models import CharField, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_MAX_TERMS, SEARCH_SNIPPET_TOKENS
+from .models import Post
+from .services import filter_published_posts
+
+FTS_TABLE = 'blog_post_fts'
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+# Внешний контент: FTS5 хранит только индекс, текст берётся из blog_post
+# по rowid = id. Заголовок весит в десять раз больше текста.
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+CONFIGURE_RANK_SQL = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')"
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+TRIGGERS_SQL = {
+    f'{FTS_TABLE}_insert': (
+        f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON blog_post BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    ),
+    f'{FTS_TABLE}_delete': (
+        f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON blog_post BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); END"
+    ),
+    # Обновление счётчиков и прочих полей индекс не трогает.
+    f'{FTS_TABLE}_update': (
+        f"CREATE TRIGGER {FTS_TABLE}_update "
+        "AFTER UPDATE OF title, text ON blog_post BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    ),
+}
+
+
+def install_search_index(connection):
+    """Создаёт FTS5-индекс публикаций и триггеры синхронизации.
+
+    Повторный вызов безопасен. SQLite удаляет триггеры вместе с таблицей,
+    а миграции Django пересоздают blog_post при изменении полей, поэтому
+    функция вызывается и после каждого migrate: недостающие триггеры
+    создаются заново, а индекс перестраивается.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR tbl_name = 'blog_post' AND type = 'trigger'",
+            [FTS_TABLE],
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute(CONFIGURE_RANK_SQL)
+        missing = [name for name in TRIGGERS_SQL if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS_SQL[name])
+        if missing:
+            cursor.execute(REBUILD_SQL)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS_SQL:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_match_query(text):
+    # Пользовательский ввод не передаётся в синтаксис FTS5 как есть:
+    # каждое слово становится префиксным поиском в кавычках.
+    terms = re.findall(r'\w+', text.lower())[:SEARCH_MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_posts(text, now=None):
+    match = build_match_query(text)
+    posts = filter_published_posts(
+        Post.objects.select_related('author', 'category'), now)
+    posts = posts.defer('text').extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = blog_post.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).annotate(
+        rank=RawSQL(f'{FTS_TABLE}.rank', [], output_field=FloatField()),
+        snippet=RawSQL(
+            f'snippet({FTS_TABLE}, -1, %s, %s, %s, %s)',
+            [SNIPPET_START, SNIPPET_END, '…', SEARCH_SNIPPET_TOKENS],
+            output_field=CharField(),
+        ),
+    )
+    # Пустой запрос FTS5 считает ошибкой синтаксиса.
+    return posts if match else posts.none()
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(SNIPPET_START, '<mark>')
+        .replace(SNIPPET_END, '</mark>')
+    )
@@ -1,25 +1,252 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db.models import (BooleanField, Case, Count, F, Max, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .constants import PAGINATE_COUNT
+from .cache import bump_tags, make_key
+from .changes import record_changes
+from .constants import (AUTHOR_STATS_TIMEOUT, CATEGORY_CACHE_TIMEOUT,
+                        FEED_CACHE_PAGES, FEED_COUNT_TIMEOUT,
+                        FEED_TIME_BUCKET, PAGINATE_COUNT,
+                        SCHEDULED_FEED_CACHE_TIMEOUT)
+from .models import AuthorStats, Category, ChangeAction, Comment, Post
+from .paginators import (CachedCountPaginator, CursorPaginator,
+                         UncountedPaginator)
+
+
+# Опубликованные категории по slug в памяти процесса. Записи категорий
+# сбрасывают кэш сигналом, а таймаут ограничивает устаревание данных
+# в соседних процессах.
+_categories_by_slug = {}
+
+
+def get_published_category(slug):
+    cached = _categories_by_slug.get(slug)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    category = get_object_or_404(Category, is_published=True, slug=slug)
+    _categories_by_slug[slug] = (
+        category, time.monotonic() + CATEGORY_CACHE_TIMEOUT)
+    return category
 
 
-def annotate_posts_with_comment_count(posts):
+def forget_categories():
+    _categories_by_slug.clear()
+
+
+def select_post_relations(posts):
     return posts.select_related(
-        'author', 'location', 'category').annotate(
-            comment_count=Count('comments')).order_by('-pub_date')
+        'author', 'location', 'category'
+    ).defer('text').order_by('-pub_date', '-id')
+
+
+def actual_comment_count():
+    return Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post').annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def recount_comment_counts(posts=None):
+    if posts is None:
+        posts = Post.objects.all()
+    actual = actual_comment_count()
+    drifted = list(posts.annotate(actual=actual).filter(
+        ~Q(comment_count=actual)).values_list('pk', flat=True))
+    # Расхождение значит, что комментарии менялись в обход сигналов:
+    # updated_at сдвигается, чтобы страницы публикаций не отдавали 304,
+    # а журнал передаёт новый счётчик репликам.
+    updated = Post.objects.filter(pk__in=drifted).update(
+        comment_count=actual, updated_at=timezone.now())
+    record_changes(Post, drifted)
+    return updated
+
+
+def refresh_author_stats(author_id, create=True):
+    # При записи строка только обновляется: создавать её здесь нельзя,
+    # сигнал может прийти во время каскадного удаления автора.
+    now = timezone.now()
+    totals = filter_published_posts(
+        Post.objects.filter(author_id=author_id), now
+    ).aggregate(
+        post_count=Count('pk'),
+        comment_count=Coalesce(Sum('comment_count'), 0),
+        last_post_date=Max('pub_date'),
+    )
+    if not create:
+        AuthorStats.objects.filter(user_id=author_id).update(
+            refreshed_at=now, **totals)
+        return None
+    stats, _ = AuthorStats.objects.update_or_create(
+        user_id=author_id, defaults={'refreshed_at': now, **totals})
+    return stats
+
+
+def refresh_commented_posts(post_ids):
+    # Пересчёт после удаления комментариев: у Comment нет сигналов
+    # удаления, поэтому счётчики, кэш и журнал обновляются здесь.
+    posts = Post.objects.filter(pk__in=post_ids)
+    posts.update(comment_count=actual_comment_count(),
+                 updated_at=timezone.now())
+    rows = list(posts.values_list(
+        'pk', 'category_id', 'author_id', 'author__username'))
+    tags = set()
+    for pk, category_id, author_id, username in rows:
+        tags |= get_post_cache_tags(category_id, author_id)
+        tags |= {f'post:{pk}', f'profile:{username}'}
+    if tags:
+        bump_tags(*tags)
+    for author_id in {row[2] for row in rows}:
+        refresh_author_stats(author_id, create=False)
+    record_changes(Post, [row[0] for row in rows])
+
+
+def delete_comments(comments):
+    """Удаляет комментарии и обновляет их публикации.
+
+    post_delete на Comment отключил бы быстрое каскадное удаление
+    публикации: Django загружал бы каждый её комментарий. Поэтому
+    одиночные удаления идут через эту функцию, а каскады обрабатывают
+    сигналы публикации и пользователя.
+    """
+    rows = [(comment.pk, comment.post_id) for comment in comments]
+    if not rows:
+        return 0
+    comment_ids = [pk for pk, _ in rows]
+    Comment.objects.filter(pk__in=comment_ids).delete()
+    record_changes(Comment, comment_ids, ChangeAction.DELETE)
+    refresh_commented_posts({post_id for _, post_id in rows})
+    return len(rows)
+
 
+def get_author_stats(author):
+    # Ожидается автор, загруженный с select_related('stats'). Отложенные
+    # публикации и снятые категории не порождают записи, поэтому
+    # статистика ещё и пересчитывается раз в AUTHOR_STATS_TIMEOUT.
+    try:
+        stats = author.stats
+    except AuthorStats.DoesNotExist:
+        return refresh_author_stats(author.pk)
+    expires = stats.refreshed_at + timedelta(seconds=AUTHOR_STATS_TIMEOUT)
+    if expires <= timezone.now():
+        return refresh_author_stats(author.pk)
+    return stats
 
-def filter_published_posts(posts):
-    return posts.filter(
+
+def get_feed_now():
+    # Граница публикации округляется вниз до начала интервала: в пределах
+    # интервала запросы лент одинаковы и их результат можно кэшировать.
+    timestamp = int(timezone.now().timestamp())
+    return datetime.fromtimestamp(
+        timestamp - timestamp % FEED_TIME_BUCKET, tz=dt_timezone.utc)
+
+
+def live_posts_q(now=None):
+    return Q(
         is_published=True,
         category__is_published=True,
-        pub_date__lte=timezone.now()
+        pub_date__lte=now or timezone.now()
     )
 
 
-def get_paginated_posts(request, posts):
-    paginator = Paginator(posts, PAGINATE_COUNT)
+def published_posts_q(now=None):
+    # При плановой публикации видимость уже записана в is_live, и запрос
+    # не зависит от времени; is_published оставлен ради частичных
+    # индексов лент.
+    if settings.BLOG_SCHEDULED_PUBLICATION:
+        return Q(is_published=True, is_live=True)
+    return live_posts_q(now)
+
+
+def filter_published_posts(posts, now=None):
+    return posts.filter(published_posts_q(now))
+
+
+def is_cursor_pagination(request):
+    return (settings.BLOG_FEED_PAGINATION == 'cursor'
+            or 'cursor' in request.GET)
+
+
+def make_feed_paginator(posts, per_page, count_key=None,
+                        count_strategy=None):
+    count_strategy = count_strategy or settings.BLOG_FEED_COUNT
+    if count_strategy == 'none':
+        return UncountedPaginator(posts, per_page)
+    if count_strategy == 'cached' and count_key:
+        return CachedCountPaginator(posts, per_page, count_key,
+                                    FEED_COUNT_TIMEOUT)
+    return Paginator(posts, per_page)
+
+
+def get_paginated_posts(request, posts, per_page=PAGINATE_COUNT,
+                        count_key=None, count_strategy=None):
+    if is_cursor_pagination(request):
+        paginator = CursorPaginator(posts, per_page)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = make_feed_paginator(posts, per_page, count_key,
+                                    count_strategy)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def get_post_cache_tags(category_id, author_id):
+    return {'index', f'category:{category_id}', f'author:{author_id}'}
+
+
+def get_feed_cache_window(now=None):
+    # Без плановой публикации состав лент меняется со временем, и ключ
+    # кэша включает интервал. С ней видимость меняется только записью
+    # или планировщиком, которые сбрасывают теги, и ключ от времени
+    # не зависит.
+    if settings.BLOG_SCHEDULED_PUBLICATION:
+        return 0, SCHEDULED_FEED_CACHE_TIMEOUT
+    return int((now or get_feed_now()).timestamp()), FEED_TIME_BUCKET
+
+
+def cache_feed_page(page, tags, now=None):
+    if getattr(page, 'keyset', False) or page.number > FEED_CACHE_PAGES:
+        return page
+    bucket, timeout = get_feed_cache_window(now)
+    key = make_key('feed', tags, bucket,
+                   page.paginator.per_page, page.number)
+    page.object_list = cache.get_or_set(
+        key, lambda: list(page.object_list), timeout)
+    return page
+
+
+def sync_live_state(posts, now=None):
+    """Пересчитывает is_live у публикаций из posts и возвращает их число.
+
+    Переключённые публикации сбрасывают кэш своих лент, статистику
+    авторов и попадают в журнал изменений. Обновление повторяет условие
+    выборки, чтобы не включить публикацию, которую успели отложить.
+    """
+    live = live_posts_q(now or timezone.now())
+    changed = list(posts.annotate(live=Case(
+        When(live, then=Value(True)), default=Value(False),
+        output_field=BooleanField(),
+    )).exclude(is_live=F('live')).values_list(
+        'pk', 'live', 'category_id', 'author_id', 'author__username'))
+    if not changed:
+        return 0
+    Post.objects.filter(live, pk__in=[
+        pk for pk, is_live, *_ in changed if is_live]).update(is_live=True)
+    Post.objects.filter(pk__in=[
+        pk for pk, is_live, *_ in changed if not is_live]).exclude(
+            live).update(is_live=False)
+    tags = set()
+    for pk, _, category_id, author_id, username in changed:
+        tags |= get_post_cache_tags(category_id, author_id)
+        tags |= {f'post:{pk}', f'profile:{username}'}
+    bump_tags(*tags)
+    record_changes(Post, [pk for pk, *_ in changed])
+    for author_id in {author_id for *_, author_id, _ in changed}:
+        refresh_author_stats(author_id, create=False)
+    return len(changed)
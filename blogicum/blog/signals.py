@@ -0,0 +1,147 @@
+from django.db.models import BooleanField, ExpressionWrapper, F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_tags
+from .changes import record_changes, record_instance_change
+from .images import delete_variants
+from .models import (AuthorStats, Category, ChangeAction, Comment, Location,
+                     Post, User)
+from .services import (forget_categories, get_post_cache_tags,
+                       published_posts_q, refresh_author_stats,
+                       refresh_commented_posts, sync_live_state)
+
+
+# Комментарии выводятся на странице публикации, поэтому любая их правка
+# сдвигает updated_at публикации: от него зависят ETag и Last-Modified.
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_author_stats(sender, instance, **kwargs):
+    author_ids = {instance.author_id}
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'author_id' in loaded:
+        author_ids.add(loaded['author_id'])
+    for author_id in author_ids:
+        refresh_author_stats(author_id, create=False)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    tags = get_post_cache_tags(instance.category_id, instance.author_id)
+    author_ids = {instance.author_id}
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'category_id' in loaded and 'author_id' in loaded:
+        tags |= get_post_cache_tags(loaded['category_id'],
+                                    loaded['author_id'])
+        author_ids.add(loaded['author_id'])
+    usernames = User.objects.filter(pk__in=author_ids).values_list(
+        'username', flat=True)
+    bump_tags(*tags, f'post:{instance.pk}',
+              *(f'profile:{username}' for username in usernames))
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_commented_post_feeds(sender, instance, created, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).annotate(
+        visible=ExpressionWrapper(published_posts_q(),
+                                  output_field=BooleanField()),
+    ).values_list(
+        'category_id', 'author_id', 'author__username', 'visible').first()
+    if post is None:
+        return
+    category_id, author_id, username, visible = post
+    bump_tags(*get_post_cache_tags(category_id, author_id),
+              f'post:{instance.post_id}', f'profile:{username}')
+    # Правка текста счётчики не меняет, удаление идёт через
+    # delete_comments.
+    if visible and created:
+        AuthorStats.objects.filter(user_id=author_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_page(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_tags(f'profile:{instance.username}', f'user:{instance.pk}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_feeds(sender, **kwargs):
+    bump_tags('feeds')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_lookup(sender, **kwargs):
+    forget_categories()
+
+
+@receiver(post_save, sender=Category)
+def sync_category_posts(sender, instance, created, **kwargs):
+    if not created:
+        sync_live_state(instance.posts.all())
+
+
+@receiver(post_delete, sender=Category)
+def hide_uncategorized_posts(sender, **kwargs):
+    # SET_NULL обновляет публикации удалённой категории в обход save().
+    sync_live_state(Post.objects.filter(is_live=True, category=None))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def journal_save(sender, instance, **kwargs):
+    record_instance_change(instance, ChangeAction.SAVE)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Post)
+def journal_delete(sender, instance, **kwargs):
+    record_instance_change(instance, ChangeAction.DELETE)
+
+
+# Сигналов удаления у Comment нет: с ними Django загружал бы каждый
+# комментарий удаляемой публикации. Каскад обрабатывается одним запросом
+# на публикацию или пользователя.
+@receiver(pre_delete, sender=Post)
+def journal_post_comments(sender, instance, **kwargs):
+    comment_ids = instance.comments.order_by().values_list('pk', flat=True)
+    record_changes(Comment, comment_ids, ChangeAction.DELETE)
+
+
+@receiver(pre_delete, sender=User)
+def collect_user_comments(sender, instance, **kwargs):
+    # Комментарии к своим публикациям уйдут вместе с ними.
+    comments = list(Comment.objects.filter(author=instance).exclude(
+        post__author=instance).values_list('pk', 'post_id'))
+    record_changes(Comment, [pk for pk, _ in comments], ChangeAction.DELETE)
+    instance._commented_post_ids = {post_id for _, post_id in comments}
+
+
+@receiver(post_delete, sender=User)
+def refresh_user_commented_posts(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_commented_post_ids', None)
+    if post_ids:
+        refresh_commented_posts(post_ids)
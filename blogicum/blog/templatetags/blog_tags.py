@@ -0,0 +1,56 @@
+from django import template
+from django.core.cache import cache
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import make_key
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+from blog.images import variant_srcset, variant_url
+from blog.search import highlight as highlight_snippet
+
+register = template.Library()
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends)
+
+
+@register.simple_tag(takes_context=True)
+def query_with(context, **params):
+    # Ссылка на ту же страницу с заменой части GET-параметров.
+    request = context.get('request')
+    query = request.GET.copy() if request else QueryDict(mutable=True)
+    for name, value in params.items():
+        query[name] = value
+    return f'?{query.urlencode()}'
+
+
+@register.filter
+def highlight(snippet):
+    return highlight_snippet(snippet)
+
+
+@register.filter
+def srcset(sizes):
+    return variant_srcset(sizes)
+
+
+@register.filter
+def default_variant_url(sizes):
+    return variant_url(sizes)
+
+
+@register.simple_tag
+def post_card(post):
+    # Карточка не зависит от зрителя, поэтому готовый HTML кэшируется
+    # до правки публикации, её комментариев, автора, категорий или мест.
+    key = make_key(
+        'card', ['feeds', f'post:{post.pk}', f'user:{post.author_id}'])
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -1,16 +1,52 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = "blog"
 
 urlpatterns = [
     path("",
          views.PostListView.as_view(), name="index"),
+    path("feed/",
+         feeds.conditional_feed(feeds.LatestPostsFeed()),
+         name="index_feed"),
+    path("feed/atom/",
+         feeds.conditional_feed(feeds.LatestPostsAtomFeed()),
+         name="index_atom_feed"),
+    path("category/<slug:category_slug>/feed/",
+         feeds.conditional_feed(feeds.CategoryPostsFeed()),
+         name="category_feed"),
+    path("category/<slug:category_slug>/feed/atom/",
+         feeds.conditional_feed(feeds.CategoryPostsAtomFeed()),
+         name="category_atom_feed"),
+    path("profile/<str:username>/feed/",
+         feeds.conditional_feed(feeds.AuthorPostsFeed()),
+         name="profile_feed"),
+    path("profile/<str:username>/feed/atom/",
+         feeds.conditional_feed(feeds.AuthorPostsAtomFeed()),
+         name="profile_atom_feed"),
+    path("api/posts/",
+         api.post_list, name="api_posts"),
+    path("api/posts/<int:post_id>/",
+         api.post_detail, name="api_post"),
+    path("api/posts/<int:post_id>/comments/",
+         api.comment_list, name="api_post_comments"),
+    path("api/categories/",
+         api.category_list, name="api_categories"),
+    path("api/categories/<slug:category_slug>/posts/",
+         api.category_posts, name="api_category_posts"),
+    path("api/authors/<str:username>/posts/",
+         api.author_posts, name="api_author_posts"),
+    path("api/changes/",
+         api.change_list, name="api_changes"),
+    path("search/",
+         views.search, name="search"),
     path("category/<slug:category_slug>/",
          views.CategoryListView.as_view(), name="category_posts"),
     path("edit_profile/",
          views.UserProfileUpdateView.as_view(), name="edit_profile"),
+    path("export/",
+         views.export_archive, name="export_archive"),
     path("profile/<str:username>/",
          views.profile, name="profile"),
     path("posts/create/",
@@ -23,6 +59,8 @@ urlpatterns = [
          views.PostUpdateView.as_view(), name="edit_post"),
     path("posts/<int:post_id>/",
          views.PostDetailView.as_view(), name="post_detail"),
+    path("posts/<int:post_id>/comments/",
+         views.PostCommentsView.as_view(), name="post_comments"),
     path("posts/<int:post_id>/delete_comment/<int:comment_id>/",
          views.CommentDeleteView.as_view(), name="delete_comment"),
     path("posts/<int:post_id>/delete/",
@@ -1,30 +1,94 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
+from django.db.models import Q
+from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 
-from .constants import PAGINATE_COUNT
-from .services import (annotate_posts_with_comment_count,
-                       filter_published_posts, get_paginated_posts)
+from .services import (cache_feed_page, delete_comments,
+                       filter_published_posts, get_author_stats,
+                       get_feed_now, get_paginated_posts,
+                       get_published_category, published_posts_q,
+                       select_post_relations)
+from .cache import make_key
+from .constants import COMMENTS_PAGINATE_COUNT, SEARCH_PAGINATE_COUNT
+from .decorators import cache_anonymous_page
+from .export import WRITERS, author_records
 from .forms import UserForm, PostForm, CommentForm
-from .models import Category, Post, User
+from .models import Post, User
+from .paginators import CursorPaginator
+from .search import search_posts
 from .mixins import (
-    PostMixin, CommentMixin, AuthorRequiredCommentMixin
+    PostMixin, CommentMixin, AuthorRequiredCommentMixin, FeedPaginationMixin
 )
 
 
+def index_page_tags():
+    return ['feeds', 'index']
+
+
+def category_page_tags(category_slug):
+    return ['feeds', f'category:{get_published_category(category_slug).pk}']
+
+
+def profile_page_tags(username):
+    return ['feeds', f'profile:{username}']
+
+
+@cache_anonymous_page('profile', profile_page_tags)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = annotate_posts_with_comment_count(
-        author.posts)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    posts = select_post_relations(author.posts)
+    audience = 'author'
     if request.user != author:
-        posts = filter_published_posts(posts)
-    page_obj = get_paginated_posts(request, posts)
-    return render(request, 'blog/profile.html',
-                  {'profile': author, 'page_obj': page_obj})
+        posts = filter_published_posts(posts, get_feed_now())
+        audience = 'public'
+    page_obj = get_paginated_posts(
+        request, posts,
+        count_key=make_key('count', ['feeds', f'author:{author.pk}'],
+                           audience),
+    )
+    return render(request, 'blog/profile.html', {
+        'profile': author,
+        'stats': get_author_stats(author),
+        'page_obj': page_obj,
+    })
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = CursorPaginator(search_posts(query), SEARCH_PAGINATE_COUNT,
+                                ordering=('rank', 'id'))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    return render(request, 'blog/search.html',
+                  {'query': query, 'page_obj': page_obj})
+
+
+@login_required
+def export_archive(request):
+    file_format = request.GET.get('format', 'jsonl')
+    if file_format not in WRITERS:
+        file_format = 'jsonl'
+    write_lines, content_type = WRITERS[file_format]
+    response = StreamingHttpResponse(
+        write_lines(author_records(request.user)),
+        content_type=f'{content_type}; charset=utf-8',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{request.user.username}.{file_format}"')
+    return response
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -53,27 +117,44 @@ class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', args=[username])
 
 
-class PostListView(ListView):
+@method_decorator(cache_anonymous_page('index', index_page_tags),
+                  name='dispatch')
+class PostListView(FeedPaginationMixin, ListView):
     model = Post
-    paginate_by = PAGINATE_COUNT
     template_name = 'blog/index.html'
-    queryset = annotate_posts_with_comment_count(
-        filter_published_posts(Post.objects)
-    )
+    cache_tags = ['feeds', 'index']
+
+    def get_count_strategy(self):
+        return settings.BLOG_INDEX_COUNT
 
+    def get_queryset(self):
+        self.feed_now = get_feed_now()
+        return select_post_relations(
+            filter_published_posts(Post.objects, self.feed_now))
 
-class CategoryListView(ListView):
+    def get_page(self, queryset, page_size):
+        return cache_feed_page(super().get_page(queryset, page_size),
+                               self.get_cache_tags(), self.feed_now)
+
+
+@method_decorator(cache_anonymous_page('category', category_page_tags),
+                  name='dispatch')
+class CategoryListView(FeedPaginationMixin, ListView):
     model = Post
     template_name = 'blog/category.html'
-    paginate_by = PAGINATE_COUNT
 
     def get_category(self):
-        return get_object_or_404(Category, is_published=True,
-                                 slug=self.kwargs['category_slug'])
+        if not hasattr(self, '_category'):
+            self._category = get_published_category(
+                self.kwargs['category_slug'])
+        return self._category
+
+    def get_cache_tags(self):
+        return ['feeds', f'category:{self.get_category().pk}']
 
     def get_queryset(self):
-        return annotate_posts_with_comment_count(
-            filter_published_posts(self.get_category().posts.all()))
+        return select_post_relations(filter_published_posts(
+            self.get_category().posts.all(), get_feed_now()))
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(**kwargs) | {
@@ -97,22 +178,69 @@ class PostDetailView(LoginRequiredMixin, DetailView):
     pk_url_kwarg = 'post_id'
 
     def get_comments(self):
-        return self.object.comments.select_related('author')
+        paginator = CursorPaginator(
+            self.object.comments.select_related('author'),
+            COMMENTS_PAGINATE_COUNT,
+            ordering=('created_at', 'id'),
+        )
+        return paginator.get_page(self.request.GET.get('cursor'))
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(**kwargs) | {
             'form': CommentForm(), 'comments': self.get_comments()}
 
-    def get_object(self):
-        post = super().get_object()
-        if self.request.user == post.author:
-            return post
-        return super().get_object(filter_published_posts(
-            Post.objects.all()))
+    def get_etag(self):
+        # Комментарии сдвигают updated_at публикации, а правки автора,
+        # категории и места — версии тегов. Страница зависит ещё
+        # от читателя (кнопки автора), от страницы комментариев и от
+        # CSRF-токена в форме комментария: после повторного входа токен
+        # меняется, и страница из кэша браузера отправила бы старый.
+        # get_token заводит токен до рендеринга, чтобы ETag первого
+        # ответа совпал со следующим.
+        if self.request.user.is_authenticated:
+            get_token(self.request)
+        key = make_key(
+            'detail', ['feeds', f'user:{self.object.author_id}'],
+            self.request.get_full_path(), self.request.user.pk,
+            self.request.META.get('CSRF_COOKIE', ''),
+            self.object.updated_at.isoformat())
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        # Условный GET проверяется до сборки контекста: на повторный
+        # запрос с тем же ETag уходит 304 без комментариев и шаблона.
+        self.object = self.get_object()
+        etag = self.get_etag()
+        last_modified = int(self.object.updated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.render_to_response(
+                self.get_context_data(object=self.object))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_queryset(self):
+        return Post.objects.select_related(
+            'author', 'category', 'location').filter(
+                Q(author_id=self.request.user.pk) | published_posts_q())
+
+
+class PostCommentsView(PostDetailView):
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        return {'post': self.object, 'comments': self.get_comments()}
 
 
 class CommentDeleteView(AuthorRequiredCommentMixin, CommentMixin, DeleteView):
-    pass
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        delete_comments([self.object])
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class CommentUpdateView(AuthorRequiredCommentMixin, CommentMixin, UpdateView):
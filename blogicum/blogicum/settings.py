@@ -67,6 +67,19 @@ DATABASES = {
     }
 }
 
+# Применяются к каждому новому соединению с SQLite (core/db.py).
+# WAL позволяет читать ленты во время записи, NORMAL в режиме WAL
+# не теряет согласованность базы, busy_timeout ждёт освобождения
+# блокировки вместо немедленной ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -93,8 +106,44 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Кэш общий для всех процессов: страницы и карточки, которые сбрасывают
+# run_worker и run_scheduler, и счётчики page_cache_stats видны
+# веб-серверу и командам. LocMemCache у каждого процесса свой.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 LOGIN_URL = 'login'
 
+# 'offset' — нумерованные страницы (?page=), 'cursor' — keyset-пагинация
+# (?cursor=) с постоянной стоимостью глубоких страниц. Курсорный режим
+# включается и для отдельного запроса, если в нём передан параметр cursor.
+BLOG_FEED_PAGINATION = 'offset'
+
+# Как считать число страниц лент: 'exact' — COUNT(*) на каждый запрос,
+# 'cached' — COUNT(*) кэшируется и сбрасывается при записи,
+# 'none' — без подсчёта, только ссылки «назад»/«вперёд».
+BLOG_FEED_COUNT = 'cached'
+BLOG_INDEX_COUNT = 'cached'
+
+# 'background' — копии фото создаёт `manage.py run_worker`, до этого
+# показывается оригинал; 'inline' — прямо в запросе на сохранение.
+BLOG_IMAGE_PROCESSING = 'background'
+
+# True — ленты показывают публикации по сохранённому полю is_live, которое
+# в момент pub_date переключает `manage.py run_scheduler`; ключи кэша лент
+# тогда не зависят от времени, поэтому нужен общий для процессов кэш
+# (проверка blog.E001). False — видимость по сравнению с now().
+BLOG_SCHEDULED_PUBLICATION = False
+
+# Токен, с которым реплики читают /api/changes/ в заголовке
+# «Authorization: Bearer <токен>». None — журнал доступен только персоналу.
+BLOG_CHANGES_TOKEN = None
+
 LANGUAGE_CODE = 'ru-RU'
 
 TIME_ZONE = 'Europe/Moscow'
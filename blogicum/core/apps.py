@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite,
+                                   dispatch_uid='core_configure_sqlite')
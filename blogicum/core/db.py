@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    # PRAGMA действуют на соединение (journal_mode — на файл базы),
+    # поэтому выставляются для каждого нового соединения.
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -1,6 +1,9 @@
 import os
 import re
+import subprocess
+import sys
 import time
+from datetime import timedelta
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -19,11 +22,13 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.utils import timezone
 from mixer.backend.django import mixer as _mixer
 
 N_PER_FIXTURE = 3
@@ -41,6 +46,15 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.services import forget_categories
+
+    cache.clear()
+    forget_categories()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -101,6 +115,21 @@ def mixer():
     return _mixer
 
 
+@pytest.fixture
+def other_process():
+    """Выполняет код в отдельном процессе Django со своими объектами
+    кэша — так работают run_worker, run_scheduler и соседние воркеры
+    веб-сервера. База там рабочая, а не тестовая: годится только
+    для операций с кэшем."""
+    def run(code):
+        subprocess.run(
+            [sys.executable, '-c', f'import django\ndjango.setup()\n{code}'],
+            cwd=Path(__file__).resolve().parent.parent / 'blogicum',
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings'},
+            check=True)
+    return run
+
+
 @pytest.fixture
 def user(mixer):
     User = get_user_model()
@@ -133,6 +162,21 @@ def another_user_client(another_user):
     return client
 
 
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location):
+    """Фабрика видимых публикаций автора user в опубликованных категории
+    и месте. days сдвигает pub_date от текущего момента, остальные поля
+    передаются явно."""
+    def make(days=-1, **fields):
+        fields = {'author': user, 'is_published': True,
+                  'pub_date': timezone.now() + timedelta(days=days),
+                  'category': published_category,
+                  'location': published_location,
+                  'text': '', 'image': '', **fields}
+        return mixer.blend('blog.Post', **fields)
+    return make
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg
 ):
@@ -363,6 +407,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
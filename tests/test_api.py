@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_json(client, url, status=200, **params):
+    response = client.get(url, params)
+    assert response.status_code == status, (
+        f"Убедитесь, что `{url}` отвечает кодом {status}."
+    )
+    assert response['Content-Type'] == 'application/json'
+    return response.json()
+
+
+def test_post_list_shows_visible_posts(client, make_post, user):
+    post = make_post()
+    make_post(is_published=False)
+    make_post(pub_date=timezone.now() + timedelta(days=1))
+    data = get_json(client, '/api/posts/')
+    assert [item['id'] for item in data['results']] == [post.id], (
+        "Убедитесь, что API отдаёт только опубликованные записи."
+    )
+    item = data['results'][0]
+    assert 'text' not in item, (
+        "Убедитесь, что список публикаций не отдаёт полный текст."
+    )
+    assert item['author'] == user.username
+    assert item['category'] == post.category.slug
+    assert item['location'] == post.location.name
+    assert item['image'] is None
+
+
+def test_post_list_sparse_fieldset(client, make_post):
+    post = make_post()
+    with CaptureQueriesContext(connection) as queries:
+        data = get_json(client, '/api/posts/', fields='id,title')
+    assert data['results'] == [{'id': post.id, 'title': post.title}], (
+        "Убедитесь, что параметр fields ограничивает поля ответа."
+    )
+    sql = queries.captured_queries[-1]['sql']
+    assert 'auth_user' not in sql and 'blog_location' not in sql, (
+        "Убедитесь, что незапрошенные связанные таблицы не присоединяются."
+    )
+    error = get_json(client, '/api/posts/', status=400, fields='password')
+    assert 'password' in error['error']
+
+
+def test_post_list_cursor_pagination(client, make_post):
+    posts = [make_post(pub_date=timezone.now() - timedelta(days=day))
+             for day in range(1, 4)]
+    seen = []
+    url, params = '/api/posts/', {'limit': 2, 'fields': 'id'}
+    while url:
+        data = get_json(client, url, **params)
+        seen += [item['id'] for item in data['results']]
+        url, params = data['next'], {}
+    assert seen == [post.id for post in posts], (
+        "Убедитесь, что курсоры API обходят все публикации по порядку."
+    )
+
+
+def test_category_and_author_posts(
+        client, make_post, user, another_user, another_category):
+    post = make_post()
+    other = make_post(category=another_category)
+    category = get_json(
+        client, f'/api/categories/{post.category.slug}/posts/', fields='id')
+    assert category['results'] == [{'id': post.id}]
+    author = get_json(client, f'/api/authors/{user.username}/posts/')
+    assert {item['id'] for item in author['results']} == {post.id, other.id}
+    empty = get_json(client, f'/api/authors/{another_user.username}/posts/')
+    assert empty['results'] == []
+    get_json(client, '/api/authors/nobody/posts/', status=404)
+
+
+def test_post_detail_with_comments(client, mixer, make_post, user):
+    post = make_post()
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    data = get_json(client, f'/api/posts/{post.id}/')
+    assert data['text'] == post.text
+    [item] = data['comments']['results']
+    assert (item['id'], item['author']) == (comment.id, user.username), (
+        "Убедитесь, что API публикации отдаёт её комментарии."
+    )
+    assert set(item) == {'id', 'text', 'author', 'created_at'}
+    data = get_json(client, f'/api/posts/{post.id}/', fields='comments')
+    assert list(data) == ['comments']
+    hidden = make_post(is_published=False)
+    get_json(client, f'/api/posts/{hidden.id}/', status=404)
+    get_json(client, f'/api/posts/{hidden.id}/comments/', status=404)
+
+
+def test_category_list(client, published_category, mixer):
+    mixer.blend('blog.Category', is_published=False)
+    data = get_json(client, '/api/categories/', fields='slug')
+    assert data['results'] == [{'slug': published_category.slug}], (
+        "Убедитесь, что API отдаёт только опубликованные категории."
+    )
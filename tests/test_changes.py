@@ -0,0 +1,114 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_changes(client, **params):
+    response = client.get('/api/changes/', params)
+    assert response.status_code == 200, (
+        "Убедитесь, что журнал изменений доступен по адресу /api/changes/."
+    )
+    return response.json()
+
+
+def entries(data):
+    return [(change['model_name'], change['object_id'], change['action'])
+            for change in data['results']]
+
+
+def test_changes_journal_writes(admin_client, mixer,
+                                post_with_published_location):
+    from blog.services import delete_comments
+
+    post = post_with_published_location
+    cursor = get_changes(admin_client)['cursor']
+    comment = mixer.blend('blog.Comment', post=post, author=post.author)
+    comment_id = comment.id
+    post.title = 'Новый заголовок'
+    post.save()
+    delete_comments([comment])
+    data = get_changes(admin_client, since=cursor)
+    assert entries(data) == [
+        ('comment', comment_id, 'save'), ('post', post.id, 'save'),
+        ('post', post.id, 'save'),
+        ('comment', comment_id, 'delete'), ('post', post.id, 'save'),
+    ], (
+        "Убедитесь, что сохранение и удаление публикаций и комментариев "
+        "записывается в журнал изменений."
+    )
+    assert not data['has_more']
+    assert get_changes(admin_client, since=data['cursor'])['results'] == []
+
+
+def test_changes_paginate_by_cursor(admin_client, mixer):
+    categories = mixer.cycle(3).blend('blog.Category')
+    seen, cursor, has_more = [], 0, True
+    while has_more:
+        data = get_changes(admin_client, since=cursor, limit=2)
+        assert len(data['results']) <= 2
+        seen += entries(data)
+        cursor, has_more = data['cursor'], data['has_more']
+    assert seen == [('category', category.id, 'save')
+                    for category in categories]
+    response = admin_client.get('/api/changes/', {'since': 'x'})
+    assert response.status_code == 400
+
+
+def test_changes_require_staff_or_token(client, user_client, settings):
+    for reader in (client, user_client):
+        assert reader.get('/api/changes/').status_code == 403, (
+            "Убедитесь, что журнал изменений, где есть и скрытые объекты, "
+            "недоступен без прав персонала или токена."
+        )
+    settings.BLOG_CHANGES_TOKEN = 'replica-token'
+    wrong = client.get('/api/changes/', HTTP_AUTHORIZATION='Bearer wrong')
+    assert wrong.status_code == 403
+    response = client.get('/api/changes/',
+                          HTTP_AUTHORIZATION='Bearer replica-token')
+    assert response.status_code == 200, (
+        "Убедитесь, что журнал изменений доступен по токену "
+        "BLOG_CHANGES_TOKEN."
+    )
+
+
+def test_recount_is_journaled(admin_client, mixer,
+                              post_with_published_location):
+    from blog.models import Post
+    from blog.services import recount_comment_counts
+
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(comment_count=3)
+    cursor = get_changes(admin_client)['cursor']
+    assert recount_comment_counts() == 1
+    assert entries(get_changes(admin_client, since=cursor)) == [
+        ('post', post.id, 'save')], (
+        "Убедитесь, что исправленные счётчики комментариев попадают "
+        "в журнал изменений."
+    )
+
+
+def test_consume_changes_command(tmp_path, mixer, published_category):
+    state = tmp_path / 'cursor'
+
+    def consume():
+        out = StringIO()
+        call_command('consume_changes', state=str(state), stdout=out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    published_category.title = 'Новое название'
+    published_category.save()
+    [change] = consume()
+    assert (change['model_name'], change['object_id']) == (
+        'category', published_category.id), (
+        "Убедитесь, что consume_changes выводит последнее действие "
+        "над каждым объектом."
+    )
+    assert consume() == [], (
+        "Убедитесь, что consume_changes продолжает с сохранённого курсора."
+    )
+    published_category.delete()
+    assert [change['action'] for change in consume()] == ['delete']
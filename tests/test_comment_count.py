@@ -0,0 +1,31 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при добавлении комментария увеличивается "
+        "счётчик комментариев публикации."
+    )
+    comment = post.comments.get()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при удалении комментария уменьшается "
+        "счётчик комментариев публикации."
+    )
+
+
+def test_recount_comments_repairs_drift(
+        PostModel, comment_to_a_post, post_with_published_location):
+    post = post_with_published_location
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', stdout=open('/dev/null', 'w'))
+    post.refresh_from_db()
+    assert post.comment_count == 1
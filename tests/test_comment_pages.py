@@ -0,0 +1,41 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_PER_PAGE = 20
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        'blog.Comment', post=post_with_published_location, author=user)
+
+
+def test_detail_page_shows_first_comments_page(
+        user_client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    response = user_client.get(f'/posts/{post.id}/')
+    comments = response.context['comments']
+    assert [comment.id for comment in comments] == [
+        comment.id for comment in many_comments[:COMMENTS_PER_PAGE]], (
+        "Убедитесь, что на странице публикации выводится первая страница "
+        "комментариев, отсортированных «от старых к новым»."
+    )
+    assert comments.has_next()
+
+
+def test_comments_fragment_returns_next_page(
+        user_client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    first = user_client.get(f'/posts/{post.id}/').context['comments']
+    response = user_client.get(
+        f'/posts/{post.id}/comments/', {'cursor': first.next_cursor})
+    assert response.status_code == 200
+    content = response.content.decode('utf-8')
+    assert '<html' not in content
+    for comment in many_comments[COMMENTS_PER_PAGE:]:
+        assert f'comment_{comment.id}"' in content, (
+            "Убедитесь, что фрагмент комментариев возвращает следующую "
+            "страницу комментариев."
+        )
+    assert not response.context['comments'].has_next()
@@ -0,0 +1,67 @@
+import pytest
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия, пользователь и публикация со связями.
+NOT_MODIFIED_QUERIES = 3
+
+
+def test_post_detail_answers_not_modified(
+        user_client, post_with_published_location,
+        django_assert_num_queries):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert response['Last-Modified'] == http_date(
+        post.updated_at.timestamp())
+    with django_assert_num_queries(NOT_MODIFIED_QUERIES):
+        cached = user_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert cached.status_code == 304, (
+        "Убедитесь, что страница публикации отвечает 304 на запрос "
+        "с совпадающим ETag."
+    )
+    assert not cached.templates, (
+        "Убедитесь, что ответ 304 отдаётся без рендеринга шаблона."
+    )
+
+
+def test_post_detail_etag_changes_on_comment(
+        user_client, another_user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = another_user_client.get(url)['ETag']
+    user_client.post(f'{url}comment/', data={'text': 'Новый комментарий'})
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы публикации."
+    )
+    assert 'Новый комментарий' in response.content.decode('utf-8')
+
+
+def test_post_detail_etag_depends_on_reader(
+        user_client, another_user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = user_client.get(url)['ETag']
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы публикации зависит от читателя: "
+        "автору показываются кнопки редактирования."
+    )
+
+
+def test_post_detail_etag_changes_on_relogin(
+        client, django_user_model, post_with_published_location):
+    django_user_model.objects.create_user('reader', password='secret-pass')
+    credentials = {'username': 'reader', 'password': 'secret-pass'}
+    url = f'/posts/{post_with_published_location.id}/'
+    client.post('/auth/login/', credentials)
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    client.post('/auth/logout/')
+    client.post('/auth/login/', credentials)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после повторного входа страница публикации "
+        "отдаётся заново: в её форме новый CSRF-токен."
+    )
@@ -0,0 +1,28 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_updated_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{i}' for i in range(30))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == ' '.join(f'слово{i}' for i in range(10)) + ' …', (
+        "Убедитесь, что при сохранении публикации анонс пересчитывается "
+        "из первых десяти слов текста."
+    )
+
+
+def test_feed_does_not_load_post_text(
+        user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get('/')
+    assert post_with_published_location.excerpt in (
+        response.content.decode('utf-8'))
+    assert not any(
+        '"blog_post"."text"' in query['sql'] for query in queries), (
+        "Убедитесь, что лента не загружает полный текст публикаций."
+    )
@@ -0,0 +1,96 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def read_jsonl(content):
+    return [json.loads(line) for line in content.splitlines() if line]
+
+
+def test_archive_contains_only_own_content(
+        user_client, user, another_user, mixer, post_with_published_location):
+    other_post = mixer.blend('blog.Post', author=another_user)
+    mixer.blend('blog.Comment', author=user, post=other_post)
+    comment = mixer.blend('blog.Comment', author=user,
+                          post=post_with_published_location)
+    response = user_client.get('/export/')
+    assert response.streaming, (
+        "Убедитесь, что архив автора отдаётся потоком."
+    )
+    records = read_jsonl(b''.join(response.streaming_content).decode())
+    posts = [record for record in records if record['type'] == 'post']
+    assert [post['id'] for post in posts] == [
+        post_with_published_location.id], (
+        "Убедитесь, что в архив попадают только публикации автора."
+    )
+    assert [record['id'] for record in records
+            if record['type'] == 'comment'] == [comment.id], (
+        "Убедитесь, что комментарии к чужим публикациям не попадают "
+        "в архив: без самих публикаций их нельзя импортировать."
+    )
+    assert {record['type'] for record in records} == {
+        'user', 'category', 'location', 'post', 'comment'}
+    assert all(record['author'] == user.username
+               for record in records if 'author' in record)
+
+
+def test_archive_imports_back(user_client, user, mixer,
+                              post_with_published_location, PostModel):
+    from blog.importer import ContentImporter
+
+    mixer.blend('blog.Comment', author=user,
+                post=post_with_published_location)
+    response = user_client.get('/export/')
+    records = read_jsonl(b''.join(response.streaming_content).decode())
+    user.delete()
+    importer = ContentImporter()
+    importer.run(enumerate(records, 1))
+    assert importer.errors == [], (
+        "Убедитесь, что архив автора импортируется без ошибок."
+    )
+    post = PostModel.objects.get(pk=post_with_published_location.pk)
+    assert post.comment_count == 1
+
+
+def test_archive_requires_login(client):
+    response = client.get('/export/')
+    assert response.status_code == 302
+
+
+@pytest.mark.parametrize('file_format', ['jsonl', 'csv'])
+def test_site_export_round_trips_through_import(
+        tmp_path, file_format, mixer, user, PostModel, CommentModel,
+        post_with_published_location):
+    mixer.cycle(3).blend('blog.Comment', author=user,
+                         post=post_with_published_location)
+    path = tmp_path / f'site.{file_format}'
+    call_command('export_content', format=file_format, output=str(path))
+    snapshot = sorted(PostModel.objects.values_list('id', 'title', 'text'))
+    CommentModel.objects.all().delete()
+    PostModel.objects.all().delete()
+    call_command('import_content', str(path), stdout=StringIO())
+    assert sorted(
+        PostModel.objects.values_list('id', 'title', 'text')) == snapshot, (
+        "Убедитесь, что выгрузку сайта можно загрузить обратно командой "
+        "import_content."
+    )
+    assert PostModel.objects.get().comment_count == 3
+
+
+def test_keyset_iteration_reads_in_batches(
+        mixer, PostModel, django_assert_num_queries):
+    from blog.export import iter_keyset
+
+    mixer.cycle(25).blend('blog.Post')
+    with django_assert_num_queries(4):
+        rows = list(iter_keyset(PostModel.objects.all(), ('title',),
+                                batch_size=10))
+    assert [row['pk'] for row in rows] == sorted(
+        PostModel.objects.values_list('pk', flat=True)), (
+        "Убедитесь, что выгрузка читает записи пачками по первичному ключу "
+        "без пропусков и повторов."
+    )
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_appears_without_restart(
+        client, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(minutes=2),
+    )
+    response = client.get('/')
+    assert post not in response.context['page_obj']
+
+    later = timezone.now() + timedelta(minutes=5)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        response = client.get('/')
+    assert post in response.context['page_obj'], (
+        "Убедитесь, что отложенная публикация появляется на главной "
+        "странице после наступления даты публикации."
+    )
+
+
+def test_index_cache_invalidated_on_post_edit(
+        client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    post.title = 'Обновлённый заголовок'
+    post.save()
+    response = client.get('/')
+    assert 'Обновлённый заголовок' in response.content.decode('utf-8'), (
+        "Убедитесь, что после редактирования публикации главная страница "
+        "показывает актуальные данные."
+    )
+
+
+def test_index_page_served_from_cache(
+        user_client, django_assert_max_num_queries,
+        many_posts_with_published_locations):
+    user_client.get('/')
+    with django_assert_max_num_queries(2):
+        response = user_client.get('/')
+    assert len(response.context['page_obj']) == 10
+
+
+def test_anonymous_index_served_from_page_cache(
+        client, django_assert_num_queries,
+        many_posts_with_published_locations):
+    first = client.get('/')
+    assert first['X-Page-Cache'] == 'miss'
+    with django_assert_num_queries(0):
+        second = client.get('/')
+    assert second['X-Page-Cache'] == 'hit', (
+        "Убедитесь, что главная страница для анонимных посетителей "
+        "отдаётся из страничного кэша."
+    )
+    assert second.content == first.content
+
+
+def test_page_cache_bypassed_for_authenticated(
+        user_client, post_with_published_location):
+    user_client.get('/')
+    response = user_client.get('/')
+    assert not response.has_header('X-Page-Cache')
+
+
+@pytest.mark.parametrize('url_template', [
+    '/', '/category/{post.category.slug}/', '/profile/{post.author.username}/',
+])
+def test_page_cache_invalidated_on_post_edit(
+        client, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    client.get(url)
+    post.title = 'Заголовок после правки'
+    post.save()
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'miss'
+    assert 'Заголовок после правки' in response.content.decode('utf-8')
+
+
+def test_page_cache_stats_command(client, post_with_published_location):
+    client.get('/')
+    client.get('/')
+    out = StringIO()
+    call_command('page_cache_stats', stdout=out)
+    assert 'index: попаданий 1, промахов 1, доля попаданий 50.0%' in (
+        out.getvalue())
+
+
+def test_page_cache_stats_shared_between_processes(other_process):
+    other_process(
+        'from blog.decorators import record_page_cache\n'
+        'record_page_cache("category", "hit")\n'
+        'record_page_cache("category", "miss")')
+    out = StringIO()
+    call_command('page_cache_stats', stdout=out)
+    assert 'category: попаданий 1, промахов 1' in out.getvalue(), (
+        "Убедитесь, что кэш общий для процессов и page_cache_stats видит "
+        "счётчики веб-сервера."
+    )
+
+
+def test_post_card_rendered_from_cache(
+        user_client, many_posts_with_published_locations):
+    user_client.get('/')
+    with mock.patch('blog.templatetags.blog_tags.render_to_string') as render:
+        response = user_client.get('/')
+    assert not render.called, (
+        "Убедитесь, что карточки публикаций берутся из кэша фрагментов."
+    )
+    assert response.content.decode('utf-8').count('card-title') == 10
+
+
+def test_post_card_invalidated_on_related_changes(
+        user_client, user, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Новый комментарий'})
+    post.location.name = 'Новое место'
+    post.location.save()
+    post.author.username = 'renamed_author'
+    post.author.save()
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Комментарии (1)' in content, (
+        "Убедитесь, что карточка публикации обновляется после "
+        "добавления комментария."
+    )
+    assert 'Новое место' in content and '@renamed_author' in content, (
+        "Убедитесь, что карточка публикации обновляется после изменения "
+        "местоположения или автора."
+    )
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        '/feed/', '/feed/atom/',
+        f'/category/{post.category.slug}/feed/',
+        f'/category/{post.category.slug}/feed/atom/',
+        f'/profile/{post.author.username}/feed/',
+        f'/profile/{post.author.username}/feed/atom/',
+    ]
+
+
+def test_feeds_list_visible_posts(
+        client, mixer, feed_urls, post_with_published_location):
+    hidden = mixer.blend(
+        'blog.Post', author=post_with_published_location.author,
+        category=post_with_published_location.category, is_published=True,
+        pub_date=timezone.now() + timedelta(days=1))
+    for url in feed_urls:
+        response = client.get(url)
+        content = response.content.decode('utf-8')
+        assert response.status_code == 200, (
+            f"Убедитесь, что лента `{url}` загружается без ошибок."
+        )
+        assert post_with_published_location.title in content
+        assert hidden.title not in content, (
+            "Убедитесь, что в RSS/Atom попадают только опубликованные "
+            "записи."
+        )
+
+
+def test_feeds_answer_conditional_get(
+        client, feed_urls, django_assert_max_num_queries):
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.has_header('ETag')
+        assert not response['ETag'].startswith('W/')
+        with django_assert_max_num_queries(2):
+            cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304, (
+            "Убедитесь, что лента отвечает 304 на запрос с совпадающим ETag."
+        )
+
+
+def test_feed_etag_changes_on_post_edit(
+        client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get('/feed/')
+    assert response['Last-Modified'] == http_date(
+        max(post.pub_date, post.updated_at).timestamp())
+    post.title = 'Новый заголовок'
+    post.save()
+    updated = client.get('/feed/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert updated.status_code == 200, (
+        "Убедитесь, что ETag ленты меняется после правки публикации."
+    )
+    assert 'Новый заголовок' in updated.content.decode('utf-8')
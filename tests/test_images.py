@@ -0,0 +1,168 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.jobs import run_pending_jobs
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_upload(width, height, image_format='PNG', **params):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(
+        buffer, image_format, **params)
+    return SimpleUploadedFile('photo.' + image_format.lower(),
+                              buffer.getvalue())
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def test_variants_generated_on_upload(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_upload(2000, 1000)
+    post.save()
+    run_pending_jobs()
+    post.refresh_from_db()
+    assert {format: [width for width, _ in sizes]
+            for format, sizes in post.image_variants.items()} == {
+        'webp': [320, 640, 1280], 'jpg': [320, 640, 1280]}, (
+        "Убедитесь, что при загрузке фото создаются уменьшенные копии "
+        "в форматах WebP и JPEG."
+    )
+    for sizes in post.image_variants.values():
+        for width, name in sizes:
+            with Image.open(media_root / name) as variant:
+                assert variant.width == width
+
+
+def test_variants_replaced_with_image(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_upload(500, 500)
+    post.save()
+    run_pending_jobs()
+    post.refresh_from_db()
+    old_files = [media_root / name
+                 for sizes in post.image_variants.values()
+                 for _, name in sizes]
+    post.image = None
+    post.save()
+    assert post.image_variants == {}
+    assert not any(path.exists() for path in old_files), (
+        "Убедитесь, что копии удалённого фото удаляются из хранилища."
+    )
+
+
+def test_feed_card_uses_srcset(
+        client, media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_upload(800, 600)
+    post.save()
+    run_pending_jobs()
+    soup = BeautifulSoup(client.get('/').content, features='html.parser')
+    images = soup.find_all('img', class_='img-thumbnail')
+    assert len(images) == 1 and images[0].get('srcset'), (
+        "Убедитесь, что в карточке публикации фото выводится одним тегом "
+        "`<img>` с атрибутом `srcset`."
+    )
+    assert soup.find('source', type='image/webp')
+    assert post.image.url not in images[0]['src']
+
+
+def test_image_processed_in_background(
+        client, media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_upload(800, 600)
+    post.save()
+    content = client.get('/').content.decode('utf-8')
+    assert post.image.url in content and 'Фото обрабатывается' in content, (
+        "Убедитесь, что до обработки фото в ленте показывается оригинал "
+        "с отметкой об обработке."
+    )
+    run_pending_jobs()
+    post.refresh_from_db()
+    assert post.image_variants and not post.image_processing
+    assert 'Фото обрабатывается' not in client.get('/').content.decode(
+        'utf-8'), (
+        "Убедитесь, что после обработки фото лента обновляется."
+    )
+
+
+def test_worker_bump_reaches_card_cache(
+        user_client, media_root, post_with_published_location,
+        other_process):
+    from blog.models import ImageStatus, Post
+
+    post = post_with_published_location
+    post.image = make_upload(800, 600)
+    post.save()
+    assert 'Фото обрабатывается' in user_client.get('/').content.decode(
+        'utf-8')
+    Post.objects.filter(pk=post.pk).update(image_status=ImageStatus.READY)
+    # Так сбрасывает теги сигнал Post.save() в процессе run_worker.
+    other_process(
+        'from blog.cache import bump_tags\n'
+        'from blog.services import get_post_cache_tags\n'
+        f'bump_tags(*get_post_cache_tags({post.category_id}, '
+        f'{post.author_id}), "post:{post.pk}")')
+    assert 'Фото обрабатывается' not in user_client.get('/').content.decode(
+        'utf-8'), (
+        "Убедитесь, что карточка в ленте обновляется, когда фото "
+        "обработано в процессе воркера."
+    )
+
+
+def test_exif_stripped_from_original(
+        media_root, post_with_published_location):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = 'Camera'
+    post = post_with_published_location
+    post.image = make_upload(300, 200, 'JPEG', exif=exif)
+    post.save()
+    run_pending_jobs()
+    with Image.open(media_root / post.image.name) as original:
+        assert not original.getexif(), (
+            "Убедитесь, что из загруженного фото удаляются EXIF-данные."
+        )
+        assert original.size == (200, 300)
+
+
+def test_invalid_image_marked_failed(
+        media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = SimpleUploadedFile('photo.png', b'not an image')
+    post.save()
+    run_pending_jobs()
+    post.refresh_from_db()
+    assert post.get_image_status_display() == 'Ошибка'
+    assert post.image_variants == {}
+
+
+def test_image_failed_after_last_attempt(
+        media_root, post_with_published_location):
+    from unittest import mock
+
+    from blog.constants import JOB_MAX_ATTEMPTS
+    from blog.models import Job, JobStatus
+
+    post = post_with_published_location
+    post.image = make_upload(300, 200)
+    post.save()
+    Job.objects.update(attempts=JOB_MAX_ATTEMPTS - 1)
+    with mock.patch('blog.jobs.generate_variants', side_effect=OSError):
+        run_pending_jobs()
+    assert Job.objects.order_by('id').last().status == JobStatus.FAILED
+    post.refresh_from_db()
+    assert post.get_image_status_display() == 'Ошибка', (
+        "Убедитесь, что после последней неудачной попытки фото "
+        "отмечается ошибкой, а не остаётся в обработке."
+    )
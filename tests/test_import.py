@@ -0,0 +1,162 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+RECORDS = [
+    {'type': 'user', 'username': 'imported_author'},
+    {'type': 'category', 'slug': 'imported', 'title': 'Импорт',
+     'description': 'Импортированная категория'},
+    {'type': 'location', 'name': 'Импортное место'},
+    *({'type': 'post', 'id': 1000 + i, 'title': f'Импорт {i}',
+       'text': 'Текст импортированной публикации',
+       'pub_date': '2020-01-01T10:00:00+00:00',
+       'created_at': '2019-12-31T10:00:00+00:00',
+       'author': 'imported_author', 'category': 'imported',
+       'location': 'Импортное место'} for i in range(5)),
+    *({'type': 'comment', 'post': 1000, 'author': 'imported_author',
+       'text': f'Комментарий {i}'} for i in range(3)),
+]
+
+
+def run_import(tmp_path, records, name='content.jsonl', **options):
+    path = tmp_path / name
+    path.write_text(
+        '\n'.join(json.dumps(record, ensure_ascii=False)
+                  for record in records), encoding='utf-8')
+    out, err = StringIO(), StringIO()
+    call_command('import_content', str(path), stdout=out, stderr=err,
+                 **options)
+    return out.getvalue(), err.getvalue()
+
+
+def test_import_creates_content(client, tmp_path, PostModel):
+    run_import(tmp_path, RECORDS, batch_size=2)
+    post = PostModel.objects.get(pk=1000)
+    assert PostModel.objects.filter(
+        author__username='imported_author').count() == 5, (
+        "Убедитесь, что команда импорта создаёт публикации из файла."
+    )
+    assert post.comment_count == 3
+    assert post.excerpt and post.created_at.year == 2019
+    content = client.get('/category/imported/').content.decode('utf-8')
+    assert 'Импорт 4' in content, (
+        "Убедитесь, что импортированные публикации видны в лентах сразу "
+        "после импорта."
+    )
+
+
+def test_import_is_idempotent_and_reports_errors(tmp_path, PostModel):
+    run_import(tmp_path, RECORDS)
+    _, err = run_import(tmp_path, [
+        *RECORDS,
+        {'type': 'post', 'title': 'Без автора', 'text': 'Текст',
+         'pub_date': '2020-01-01T10:00:00', 'author': 'nobody'},
+        {'type': 'unknown'},
+    ])
+    assert PostModel.objects.count() == 5, (
+        "Убедитесь, что повторный импорт не дублирует публикации."
+    )
+    assert 'nobody' in err and 'unknown' in err
+
+
+def test_import_csv(tmp_path, PostModel):
+    path = tmp_path / 'content.csv'
+    path.write_text(
+        'type,username,slug,title,description,text,pub_date,author,category\n'
+        'user,csv_author,,,,,,,\n'
+        'category,,csv,CSV,Категория,,,,\n'
+        'post,,,Из CSV,,Текст,2020-01-01 10:00,csv_author,csv\n',
+        encoding='utf-8')
+    call_command('import_content', str(path), stdout=StringIO())
+    assert PostModel.objects.filter(title='Из CSV',
+                                    category__slug='csv').exists()
+
+
+def test_import_into_non_empty_database(tmp_path, mixer, user,
+                                        PostModel, CommentModel):
+    existing = mixer.blend('blog.Post', id=1000, author=user, image='',
+                           title='Существующая')
+    mixer.blend('blog.Comment', id=7, post=existing, author=user)
+    out, err = run_import(tmp_path, [
+        *RECORDS,
+        {'type': 'comment', 'id': 7, 'post': 1001,
+         'author': 'imported_author', 'text': 'Занятый id'},
+    ])
+    existing = PostModel.objects.get(pk=1000)
+    assert existing.title == 'Существующая', (
+        "Убедитесь, что импорт не перезаписывает существующие публикации."
+    )
+    assert existing.created_at.year != 2019
+    assert existing.comment_count == 4, (
+        "Убедитесь, что комментарии из файла привязываются к уже "
+        "существующим публикациям и пересчитывают их счётчик."
+    )
+    assert 'id 1000' in err and 'id 7' in err, (
+        "Убедитесь, что занятые id публикаций и комментариев выводятся "
+        "как ошибки."
+    )
+    assert 'post: 4, comment: 3' in out.splitlines()[-1], (
+        "Убедитесь, что импорт считает только вставленные записи."
+    )
+    assert CommentModel.objects.get(pk=7).post_id == 1000
+
+
+def test_import_leaves_other_posts_alone(tmp_path, mixer, user, PostModel):
+    other = mixer.blend('blog.Post', author=user, image='')
+    PostModel.objects.filter(pk=other.pk).update(comment_count=5)
+    run_import(tmp_path, RECORDS, batch_size=2)
+    assert PostModel.objects.get(pk=other.pk).comment_count == 5, (
+        "Убедитесь, что импорт пересчитывает только свои публикации."
+    )
+    assert PostModel.objects.filter(pk=1004, is_live=True).exists()
+
+
+def test_import_comments_for_existing_post(tmp_path, mixer, user,
+                                           PostModel):
+    post = mixer.blend('blog.Post', author=user, image='')
+    _, err = run_import(tmp_path, [
+        {'type': 'user', 'username': 'commenter'},
+        {'type': 'comment', 'post': post.id, 'author': 'commenter',
+         'text': 'Комментарий к старой публикации'},
+        {'type': 'comment', 'post': 999999, 'author': 'commenter',
+         'text': 'Без публикации'},
+    ])
+    assert PostModel.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что файл только с комментариями импортируется "
+        "к существующим публикациям."
+    )
+    assert 'Строка 3: Публикация не найдена: 999999' in err
+
+
+def test_import_skips_malformed_lines(tmp_path, PostModel):
+    path = tmp_path / 'content.jsonl'
+    lines = [json.dumps(record, ensure_ascii=False) for record in RECORDS]
+    lines[4:4] = ['{"type": "post", ', '[1, 2]']
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    err = StringIO()
+    call_command('import_content', str(path), stdout=StringIO(), stderr=err)
+    assert PostModel.objects.get(pk=1000).comment_count == 3, (
+        "Убедитесь, что испорченные строки не обрывают импорт."
+    )
+    assert 'Строка 5: Некорректный JSON' in err.getvalue()
+    assert 'Строка 6: Запись должна быть объектом' in err.getvalue()
+
+
+def test_import_finishes_written_batches_on_failure(PostModel):
+    from blog.importer import ContentImporter
+
+    def records():
+        yield from enumerate(RECORDS, 1)
+        raise OSError('Файл оборвался')
+
+    with pytest.raises(OSError):
+        ContentImporter(batch_size=2).run(records())
+    post = PostModel.objects.get(pk=1000)
+    assert (post.comment_count, post.is_live) == (3, True), (
+        "Убедитесь, что при обрыве чтения уже записанные пачки получают "
+        "счётчики комментариев и видимость."
+    )
@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+
+from blog.paginators import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url, cursor_key):
+    seen = []
+    cursor = ''
+    pages = 0
+    while cursor is not None:
+        response = client.get(url, {'cursor': cursor})
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` с параметром `cursor` "
+            "загружается без ошибок."
+        )
+        page_obj = response.context['page_obj']
+        assert len(page_obj) <= N_PER_PAGE, (
+            "Убедитесь, что при курсорной пагинации на странице "
+            f"выводится не больше {N_PER_PAGE} публикаций."
+        )
+        seen.extend(post.id for post in page_obj)
+        cursor = getattr(page_obj, cursor_key)
+        pages += 1
+    return seen, pages
+
+
+def test_cursor_pagination_walks_feed(
+        client, PostModel, many_posts_with_published_locations):
+    expected = list(
+        PostModel.objects.order_by('-pub_date', '-id')
+        .values_list('id', flat=True)
+    )
+    seen, pages = _walk_cursor_pages(client, '/', 'next_cursor')
+    assert seen == expected, (
+        "Убедитесь, что при курсорной пагинации публикации выводятся "
+        "по одному разу и отсортированы «от новых к старым»."
+    )
+    assert pages == -(-len(expected) // N_PER_PAGE)
+
+
+def test_cursor_pagination_previous_page(
+        client, many_posts_with_published_locations):
+    first = client.get('/', {'cursor': ''}).context['page_obj']
+    second = client.get(
+        '/', {'cursor': first.next_cursor}).context['page_obj']
+    back = client.get(
+        '/', {'cursor': second.previous_cursor}).context['page_obj']
+    assert [post.id for post in back] == [post.id for post in first], (
+        "Убедитесь, что ссылка на предыдущую страницу курсорной "
+        "пагинации возвращает предыдущие публикации."
+    )
+    assert not back.has_previous()
+
+
+def test_cursor_pagination_ignores_broken_cursor(
+        client, many_posts_with_published_locations):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
+
+
+def test_uncounted_index_pagination(
+        client, settings, many_posts_with_published_locations):
+    settings.BLOG_INDEX_COUNT = 'none'
+    first = client.get('/').context['page_obj']
+    second = client.get('/', {'page': 2}).context['page_obj']
+    assert first.has_next() and not second.has_next(), (
+        "Убедитесь, что пагинация без подсчёта записей корректно "
+        "определяет наличие следующей страницы."
+    )
+    assert len(second) == N_PER_PAGE
+
+
+def test_cached_count_skips_count_query(
+        user_client, published_category, many_posts_with_published_locations):
+    url = f'/category/{published_category.slug}/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.context['page_obj'].paginator.count == 2 * N_PER_PAGE
+    assert not any('COUNT(' in query['sql'] for query in queries), (
+        "Убедитесь, что число публикаций в ленте берётся из кэша."
+    )
+
+
+def test_stale_cached_count_keeps_tail_pages():
+    cache.set('stale-count', 3)
+    paginator = CachedCountPaginator(range(25), 10, 'stale-count', 60)
+    assert list(paginator.get_page(3)) == list(range(20, 25)), (
+        "Убедитесь, что заниженное число записей в кэше не скрывает "
+        "последние страницы ленты."
+    )
+    paginator = CachedCountPaginator(range(25), 10, 'stale-count', 60)
+    assert paginator.get_page(1).has_next()
+    assert list(paginator.get_page(4)) == list(range(10, 20))
+
+
+def test_paginator_renders_constant_number_of_links():
+    sizes = []
+    for total in (10 ** 3, 10 ** 6):
+        page = Paginator(range(total), N_PER_PAGE).page(50)
+        html = render_to_string('includes/paginator.html', {'page_obj': page})
+        sizes.append(html.count('<li'))
+    assert sizes[0] == sizes[1] < 20, (
+        "Убедитесь, что пагинатор выводит ограниченное число ссылок на "
+        "страницы независимо от общего количества публикаций."
+    )
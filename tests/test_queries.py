@@ -0,0 +1,154 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия, пользователь, публикация со связями и страница комментариев.
+DETAIL_PAGE_QUERIES = 4
+
+
+@pytest.mark.parametrize('client_name', ['user_client', 'another_user_client'])
+def test_post_detail_query_budget(
+        request, client_name, django_assert_num_queries,
+        post_with_published_location, comment_to_a_post):
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(DETAIL_PAGE_QUERIES):
+        response = client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.status_code == 200
+
+
+def _comment_url(comment, action):
+    return f'/posts/{comment.post_id}/{action}_comment/{comment.id}/'
+
+
+@pytest.mark.parametrize('action, method, expected_queries', [
+    ('edit', 'get', 3),
+    ('delete', 'get', 3),
+    # Удаление также обновляет счётчики публикации, статистику автора
+    # и пишет журнал изменений.
+    ('delete', 'post', 10),
+])
+def test_comment_author_views_fetch_object_once(
+        mixer, user, user_client, django_assert_num_queries,
+        post_with_published_location, action, method, expected_queries):
+    comment = mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user)
+    url = _comment_url(comment, action)
+    with django_assert_num_queries(expected_queries) as captured:
+        getattr(user_client, method)(url)
+    comment_selects = [
+        query for query in captured.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "blog_comment"' in query['sql']
+    ]
+    assert len(comment_selects) == 1, (
+        "Убедитесь, что комментарий загружается из базы один раз за запрос."
+    )
+
+
+@pytest.mark.parametrize('action, expected_queries', [
+    ('edit', 5),
+    ('delete', 3),
+])
+def test_post_author_views_fetch_object_once(
+        user_client, django_assert_num_queries,
+        post_with_published_location, action, expected_queries):
+    post = post_with_published_location
+    with django_assert_num_queries(expected_queries) as captured:
+        user_client.get(f'/posts/{post.id}/{action}/')
+    post_selects = [
+        query for query in captured.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "blog_post"' in query['sql']
+    ]
+    assert len(post_selects) == 1, (
+        "Убедитесь, что публикация загружается из базы один раз за запрос."
+    )
+
+
+def test_category_resolved_without_database_when_cached(
+        user_client, published_category, post_with_published_location):
+    url = f'/category/{published_category.slug}/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get(url)
+    assert response.context['category'] == published_category
+    assert not any('"blog_category"."slug" = ' in query['sql']
+                   for query in captured.captured_queries), (
+        "Убедитесь, что категория ищется по slug не чаще одного раза и "
+        "повторные запросы берут её из кэша."
+    )
+
+
+def test_category_cache_invalidated_on_save(client, published_category):
+    url = f'/category/{published_category.slug}/'
+    assert client.get(url).status_code == 200
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404
+
+
+def test_profile_query_budget(
+        client, django_assert_num_queries, user, mixer,
+        many_posts_with_published_locations):
+    # Автор со статистикой одним запросом и страница публикаций.
+    client.get(f'/profile/{user.username}/', {'page': 2})
+    with django_assert_num_queries(2):
+        response = client.get(f'/profile/{user.username}/')
+    stats = response.context['stats']
+    assert stats.post_count == len(many_posts_with_published_locations), (
+        "Убедитесь, что на странице пользователя выводится число его "
+        "публикаций."
+    )
+
+
+def test_author_stats_updated_on_write(
+        client, mixer, user, another_user, post_with_published_location):
+    url = f'/profile/{user.username}/'
+    assert client.get(url).context['stats'].comment_count == 0
+    mixer.blend('blog.Comment', post=post_with_published_location,
+                author=another_user)
+    mixer.blend('blog.Post', author=user,
+                category=post_with_published_location.category,
+                is_published=True,
+                pub_date=post_with_published_location.pub_date)
+    stats = client.get(url).context['stats']
+    assert (stats.post_count, stats.comment_count) == (2, 1), (
+        "Убедитесь, что статистика автора обновляется при добавлении "
+        "публикаций и комментариев."
+    )
+
+
+@pytest.mark.parametrize('comments', [1, 50])
+def test_post_delete_cascades_comments_in_bulk(
+        mixer, user, another_user, django_assert_num_queries,
+        post_with_published_location, comments):
+    from blog.models import Change, Comment
+
+    post = post_with_published_location
+    mixer.cycle(comments).blend('blog.Comment', post=post,
+                                author=another_user)
+    # Не зависит от числа комментариев: журнал комментариев, удаление
+    # комментариев и публикации, статистика автора и сброс кэша.
+    with django_assert_num_queries(8):
+        post.delete()
+    assert not Comment.objects.exists()
+    assert Change.objects.filter(
+        model_name='comment', action='delete').count() == comments, (
+        "Убедитесь, что каскадное удаление комментариев попадает "
+        "в журнал изменений."
+    )
+
+
+def test_user_delete_recounts_commented_posts(
+        mixer, user, another_user, post_with_published_location):
+    from blog.models import Post
+
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    another_user.delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 0, (
+        "Убедитесь, что удаление пользователя пересчитывает счётчики "
+        "комментариев к чужим публикациям."
+    )
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_is_live_follows_visibility(make_post, published_category):
+    from blog.models import Post
+
+    current = make_post(-1)
+    future = make_post(1)
+    assert current.is_live and not future.is_live, (
+        "Убедитесь, что is_live включается только у публикаций, "
+        "время которых наступило."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.get(pk=current.pk).is_live, (
+        "Убедитесь, что снятие категории с публикации выключает is_live "
+        "её публикаций."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert Post.objects.get(pk=current.pk).is_live
+
+
+@pytest.mark.parametrize('scheduled', [False, True])
+def test_scheduler_publishes_due_posts(client, settings, make_post,
+                                       scheduled):
+    from blog.models import Post
+    from blog.scheduler import publish_due_posts, seconds_until_next
+
+    settings.BLOG_SCHEDULED_PUBLICATION = scheduled
+    future = make_post(1)
+    assert future.title not in client.get('/').content.decode('utf-8')
+    assert 0 < seconds_until_next(interval=10 ** 6) <= 24 * 60 * 60, (
+        "Убедитесь, что планировщик просыпается к ближайшей pub_date."
+    )
+    assert publish_due_posts() == 0
+    Post.objects.filter(pk=future.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    assert publish_due_posts() == 1
+    assert Post.objects.get(pk=future.pk).is_live
+    assert future.title in client.get('/').content.decode('utf-8'), (
+        "Убедитесь, что публикация появляется в ленте сразу после того, "
+        "как планировщик включил её."
+    )
+
+
+def test_scheduler_lease():
+    from blog.scheduler import acquire_lease, release_lease
+
+    assert acquire_lease('first')
+    assert acquire_lease('first'), (
+        "Убедитесь, что владелец может продлить свою аренду."
+    )
+    assert not acquire_lease('second'), (
+        "Убедитесь, что чужую аренду нельзя взять до её истечения."
+    )
+    release_lease('first')
+    assert acquire_lease('second')
+
+
+def test_run_scheduler_command(make_post):
+    from blog.models import Post
+
+    post = make_post(1)
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    out = StringIO()
+    call_command('run_scheduler', once=True, stdout=out)
+    assert 'Обновлена видимость публикаций: 1' in out.getvalue()
+    assert Post.objects.get(pk=post.pk).is_live
+
+
+def test_scheduler_bump_reaches_web_cache(client, settings, make_post,
+                                          other_process):
+    from blog.models import Post
+
+    settings.BLOG_SCHEDULED_PUBLICATION = True
+    future = make_post(1)
+    assert future.title not in client.get('/').content.decode('utf-8')
+    assert client.get('/')['X-Page-Cache'] == 'hit'
+    Post.objects.filter(pk=future.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1), is_live=True)
+    # Так сбрасывает теги sync_live_state в процессе run_scheduler.
+    other_process(
+        'from blog.cache import bump_tags\n'
+        'from blog.services import get_post_cache_tags\n'
+        f'bump_tags(*get_post_cache_tags({future.category_id}, '
+        f'{future.author_id}))')
+    assert future.title in client.get('/').content.decode('utf-8'), (
+        "Убедитесь, что сброс тегов из процесса планировщика доходит "
+        "до кэша страниц веб-сервера."
+    )
+
+
+def test_scheduled_publication_requires_shared_cache(settings):
+    from blog.checks import check_scheduled_publication_cache
+
+    settings.BLOG_SCHEDULED_PUBLICATION = True
+    assert check_scheduled_publication_cache(None) == []
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    [error] = check_scheduled_publication_cache(None)
+    assert error.id == 'blog.E001', (
+        "Убедитесь, что плановая публикация с кэшем в памяти процесса "
+        "отклоняется проверкой."
+    )
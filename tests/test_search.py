@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска загружается без ошибок."
+    )
+    return response
+
+
+def test_search_ranks_and_highlights(client, make_post):
+    in_text = make_post(title='Про погоду',
+                        text='Пушистые котики спят <на солнце>')
+    in_title = make_post(title='Котики', text='Текст без ключевого слова')
+    make_post(title='Собаки', text='Совсем другая тема')
+    response = search(client, 'котик')
+    assert list(response.context['page_obj']) == [in_title, in_text], (
+        "Убедитесь, что поиск находит публикации по заголовку и тексту "
+        "и ставит совпадения в заголовке выше."
+    )
+    content = response.content.decode('utf-8')
+    assert '<mark>котики</mark> спят &lt;на солнце&gt;' in content, (
+        "Убедитесь, что в результатах поиска выводится фрагмент текста "
+        "с выделенными совпадениями."
+    )
+
+
+def test_search_respects_visibility(client, make_post, mixer):
+    hidden_category = mixer.blend('blog.Category', is_published=False)
+    make_post(title='Котики снятые', is_published=False)
+    make_post(title='Котики отложенные',
+              pub_date=timezone.now() + timedelta(days=1))
+    make_post(title='Котики в скрытой категории',
+              category=hidden_category)
+    visible = make_post(title='Котики видимые')
+    assert list(search(client, 'котики').context['page_obj']) == [visible], (
+        "Убедитесь, что поиск показывает только опубликованные записи."
+    )
+
+
+def test_search_index_follows_post_writes(client, make_post):
+    post = make_post(title='Котики')
+    post.title = 'Собаки'
+    post.save()
+    assert not search(client, 'котики').context['page_obj']
+    assert list(search(client, 'собаки').context['page_obj']) == [post]
+    post.delete()
+    assert not search(client, 'собаки').context['page_obj'], (
+        "Убедитесь, что поисковый индекс обновляется при изменении "
+        "и удалении публикаций."
+    )
+
+
+def test_search_keyset_pagination(client, make_post):
+    posts = [make_post(title=f'Котики {i}') for i in range(15)]
+    first = search(client, 'котики').context['page_obj']
+    assert 'q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA%D0%B8&amp;cursor=' in (
+        search(client, 'котики').content.decode('utf-8'))
+    second = search(client, 'котики',
+                    cursor=first.next_cursor).context['page_obj']
+    assert {post.id for post in [*first, *second]} == {
+        post.id for post in posts}, (
+        "Убедитесь, что результаты поиска разбиты на страницы без "
+        "пропусков и повторов."
+    )
+    assert not second.has_next()
+
+
+@pytest.mark.parametrize('query', ['', '"*(', 'NEAR AND OR'])
+def test_search_handles_any_input(client, make_post, query):
+    make_post(title='Котики')
+    search(client, query)
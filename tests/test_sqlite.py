@@ -0,0 +1,20 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_applied(settings):
+    with connection.cursor() as cursor:
+        pragmas = {}
+        for name in ('synchronous', 'busy_timeout', 'temp_store'):
+            cursor.execute(f'PRAGMA {name}')
+            pragmas[name] = cursor.fetchone()[0]
+    # synchronous: 1 — NORMAL, temp_store: 2 — MEMORY.
+    assert pragmas == {
+        'synchronous': 1,
+        'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+        'temp_store': 2,
+    }, (
+        "Убедитесь, что настройки SQLITE_PRAGMAS применяются к каждому "
+        "соединению с базой данных."
+    )